@@ -0,0 +1,121 @@
+import random
+from dataclasses import MISSING, fields
+from typing import Any, Optional
+
+import pytest
+
+# Синтетические расписания для тестов нормализации. Нужны только классы из сабмодулей парсеров, сами парсеры
+# (и сеть) не используются; без сабмодулей тесты пропускаются
+pytest.importorskip("tvgu_data_hub.schedule_parser.tvgu_schedule_parser")
+pytest.importorskip("tvgu_data_hub.teachers_parser.tvgu_teachers_parser")
+pytest.importorskip("tvgu_data_hub.structs_parser.tvgu_structs_parser")
+
+from tvgu_data_hub.schedule_parser.tvgu_schedule_parser.consts import WeekMark, SubjectType
+from tvgu_data_hub.schedule_parser.tvgu_schedule_parser.misc import AllGroupsSchedules, Group, Lesson, \
+    TeacherSmall
+from tvgu_data_hub.structs_parser.tvgu_structs_parser.normalizer import TvGUStruct
+from tvgu_data_hub.teachers_parser.tvgu_teachers_parser.misc import Teacher
+
+SUBJECTS_NAMES: tuple[str, ...] = ("Алгебра", "Математический анализ", "Физика", "История", "Программирование")
+PLACES: tuple[str, ...] = ("101", "202", "303", "https://meet.example/lesson")
+
+
+def make_dataclass(class_: type, **values: Any) -> Any:
+    # Поля, не важные для нормализации, заполняются `None`: так тестам не нужно знать полный состав классов парсеров
+    for field in fields(class_):
+        if field.name not in values and field.default is MISSING and field.default_factory is MISSING:
+            values[field.name] = None
+    return class_(**values)
+
+
+def make_teacher(surname: str, name: str, patronymic: str) -> Teacher:
+    return make_dataclass(
+        Teacher, name=name, surname=surname, patronymic=patronymic, initials=f"{surname} {name[0]}.{patronymic[0]}."
+    )
+
+
+def make_lesson(week_day: int, lesson_number: int, subject_name: str, place: str,
+                teachers_initials: tuple[str, ...] = (), week_mark: Optional[WeekMark] = None,
+                subject_type: Optional[SubjectType] = None) -> Lesson:
+    return make_dataclass(
+        Lesson,
+        week_mark=week_mark or list(WeekMark)[0],
+        week_day=week_day,
+        lesson_number=lesson_number,
+        subject_name=subject_name,
+        subject_type=subject_type or list(SubjectType)[0],
+        place=place,
+        teachers=tuple(make_dataclass(TeacherSmall, initials=initials) for initials in teachers_initials)
+    )
+
+
+def make_group(faculty_code: str, number: int) -> Group:
+    return make_dataclass(Group, origin_name=f"{faculty_code}-{number}", faculty_code=faculty_code)
+
+
+def make_structs(schedules: AllGroupsSchedules) -> list[TvGUStruct]:
+    # Код структуры совпадает с кодом факультета в расписании: по нему группы привязываются к структурам
+    return [
+        make_dataclass(
+            TvGUStruct,
+            name=f"Факультет {faculty_code}",
+            code=faculty_code,
+            groups=tuple(group.origin_name for group in groups),
+            departments=()
+        )
+        for faculty_code, groups in schedules.items()
+    ]
+
+
+def patch_fetchers(monkeypatch, schedules: AllGroupsSchedules, teachers: tuple[Teacher, ...] = ()) -> None:
+    """Подменяет сбор данных парсерами: `get_all_tvgu_data` получит синтетические структуры, преподавателей и пары"""
+
+    from tvgu_data_hub.schedule_parser import tvgu_schedule_parser
+    from tvgu_data_hub.structs_parser import tvgu_structs_parser
+    from tvgu_data_hub.teachers_parser import tvgu_teachers_parser
+
+    structs: list[TvGUStruct] = make_structs(schedules)
+
+    async def get_all_tvgu_structs() -> list[TvGUStruct]:
+        return structs
+
+    async def get_all_tvgu_teachers() -> list[Teacher]:
+        return list(teachers)
+
+    async def get_all_tvgu_schedules() -> AllGroupsSchedules:
+        return schedules
+
+    monkeypatch.setattr(tvgu_structs_parser, "get_all_tvgu_structs", get_all_tvgu_structs)
+    monkeypatch.setattr(tvgu_teachers_parser, "get_all_tvgu_teachers", get_all_tvgu_teachers)
+    monkeypatch.setattr(tvgu_schedule_parser, "get_all_tvgu_schedules", get_all_tvgu_schedules)
+
+
+def make_schedules(faculties: int, groups_per_faculty: int, lessons_per_group: int,
+                   teachers_initials: tuple[str, ...], seed: int = 1) -> AllGroupsSchedules:
+    """
+    Расписания со случайными парами из небольшого набора слотов: одинаковые пары встречаются у нескольких групп
+    (в том числе разных факультетов), поэтому нормализации есть что объединять
+    """
+
+    random_: random.Random = random.Random(seed)
+    schedules: AllGroupsSchedules = {}
+
+    for faculty_number in range(faculties):
+        faculty_code: str = f"f{faculty_number}"
+        schedules[faculty_code] = {}
+
+        for group_number in range(groups_per_faculty):
+            schedules[faculty_code][make_group(faculty_code, group_number)] = [
+                make_lesson(
+                    week_day=random_.randint(1, 6),
+                    lesson_number=random_.randint(1, 5),
+                    subject_name=random_.choice(SUBJECTS_NAMES),
+                    place=random_.choice(PLACES),
+                    teachers_initials=tuple(random_.sample(teachers_initials, random_.randint(0, 2))),
+                    week_mark=random_.choice(list(WeekMark)),
+                    subject_type=random_.choice(list(SubjectType))
+                )
+                for _ in range(lessons_per_group)
+            ]
+
+    return schedules
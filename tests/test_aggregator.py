@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from tests.synthetic import make_group, make_lesson, patch_fetchers
+from tvgu_data_hub import aggregator
+from tvgu_data_hub.hub import TvGUInfo, get_all_tvgu_data
+
+
+def _schedules():
+    # Один и тот же предмет в одном слоте и месте у двух групп, но записан по-разному - до канонизации это разные пары
+    return {
+        "f0": {
+            make_group("f0", 0): [make_lesson(0, 1, "Математический анализ", "101", ("Иванов И.И.",))],
+            make_group("f0", 1): [make_lesson(0, 1, "Мат. анализ", "101", ("Петров П.П.",))],
+        }
+    }
+
+
+@pytest.mark.parametrize("canonicalize, expected_lessons", [(False, 2), (True, 1)])
+@pytest.mark.parametrize("workers", [None, 2])
+def test_canonicalized_lessons_are_merged(monkeypatch, canonicalize, expected_lessons, workers):
+    monkeypatch.setattr(aggregator, "CANONICALIZE_SUBJECTS", canonicalize)
+    patch_fetchers(monkeypatch, _schedules())
+
+    info: TvGUInfo = asyncio.run(get_all_tvgu_data(workers))
+
+    assert len(info.lessons) == expected_lessons
+    assert sorted(group_id for lesson in info.lessons for group_id in lesson.groups_ids) == [0, 1]
+    assert len({teacher_id for lesson in info.lessons for teacher_id in lesson.teachers_ids}) == 2
+
+    if canonicalize:
+        assert [subject.name for subject in info.subjects] == ["Математический анализ"]
+        assert [alias.name for alias in info.subject_aliases] == ["Мат. анализ"]
@@ -0,0 +1,36 @@
+import sys
+
+import pytest
+
+from tvgu_data_hub.__main__ import Args, parse_args
+
+SEMESTER: tuple[str, ...] = ("--semester-start", "2026-09-01", "--semester-end", "2026-12-31")
+
+
+@pytest.mark.parametrize("argv", [
+    ("-s", "snapshot.json", "ics", "calendars", *SEMESTER),
+    ("ics", "calendars", "-s", "snapshot.json", *SEMESTER),
+    ("-s", "snapshot.json", "shards", "static"),
+    ("shards", "static", "-s", "snapshot.json"),
+])
+def test_snapshot_before_or_after_command(monkeypatch, argv):
+    monkeypatch.setattr(sys, "argv", ["tvgu_data_hub", *argv])
+
+    assert parse_args().snapshot == "snapshot.json"
+
+
+@pytest.mark.parametrize("argv", [
+    ("-o", "patch.json", "-p", "diff", "old.json", "new.json"),
+    ("diff", "old.json", "new.json", "-o", "patch.json", "-p"),
+])
+def test_output_before_or_after_command(monkeypatch, argv):
+    monkeypatch.setattr(sys, "argv", ["tvgu_data_hub", *argv])
+    args: Args = parse_args()
+
+    assert (args.output, args.prettify, args.inputs) == ("patch.json", True, ("old.json", "new.json"))
+
+
+def test_command_without_snapshot_fetches_live_data(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["tvgu_data_hub", "shards", "static"])
+
+    assert parse_args().snapshot is None
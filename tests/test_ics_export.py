@@ -0,0 +1,101 @@
+import re
+from datetime import date
+
+import pytest
+
+from tvgu_data_hub.ics_export import ICS_LINE_LIMIT, _collect_calendars, render_calendar
+from tvgu_data_hub.semester import Semester
+
+SEMESTER = Semester(start=date(2026, 9, 2), end=date(2026, 9, 16))
+
+
+def _events() -> list[dict]:
+    # Даты событий зависят от `WeekMark`, поэтому без сабмодуля парсера расписания такие тесты пропускаются
+    consts = pytest.importorskip("tvgu_data_hub.schedule_parser.tvgu_schedule_parser.consts")
+
+    return [
+        {
+            "uid": "plus-wednesday",
+            "week_mark": consts.WeekMark.PLUS.value,
+            "week_day": 2,
+            "lesson_number": 1,
+            "summary": "Математический анализ (лекция)",
+            "location": "101",
+            # Кириллица занимает по два октета, поэтому строка описания заведомо длиннее 75 октетов
+            "description": "Преподаватели: Иванов Иван Иванович, Петров Пётр Петрович\nГруппы: fm-1, fm-2, fm-3",
+        },
+        {
+            "uid": "every-monday",
+            "week_mark": consts.WeekMark.EVERY.value,
+            "week_day": 0,
+            "lesson_number": 7,
+            "summary": "Алгебра",
+            "location": "202",
+            "description": "Преподаватели: -\nГруппы: fm-1",
+        },
+    ]
+
+
+def _unfold(calendar: str) -> list[str]:
+    return calendar.replace("\r\n ", "").split("\r\n")[:-1]
+
+
+def test_event_dates():
+    lines: list[str] = _unfold(render_calendar("fm-1", _events(), SEMESTER))
+    starts: list[str] = [line.removeprefix("DTSTART:") for line in lines if line.startswith("DTSTART:")]
+    ends: list[str] = [line.removeprefix("DTEND:") for line in lines if line.startswith("DTEND:")]
+    uids: list[str] = [line.removeprefix("UID:") for line in lines if line.startswith("UID:")]
+
+    # 1-я пара 8:30-10:05 и 7-я 19:15-20:50 по Москве (UTC+3); чётные среды - 02.09 и 16.09, понедельники - 07.09
+    # и 14.09 (понедельник 31.08 раньше начала семестра)
+    assert starts == ["20260902T053000Z", "20260907T161500Z", "20260914T161500Z", "20260916T053000Z"]
+    assert ends == ["20260902T070500Z", "20260907T175000Z", "20260914T175000Z", "20260916T070500Z"]
+    assert uids[0] == "plus-wednesday-20260902@tvgu-data-hub"
+    assert len(set(uids)) == len(uids)
+
+
+def test_lines_folded():
+    calendar: str = render_calendar("fm-1", _events(), SEMESTER)
+    physical_lines: list[str] = calendar.split("\r\n")
+
+    assert calendar.endswith("END:VCALENDAR\r\n")
+    assert "\n" not in calendar.replace("\r\n", "")
+    assert all(len(line.encode("UTF-8")) <= ICS_LINE_LIMIT for line in physical_lines)
+    assert any(line.startswith(" ") for line in physical_lines)
+
+    descriptions: list[str] = [line for line in _unfold(calendar) if line.startswith("DESCRIPTION:")]
+    assert descriptions[0] == (
+        "DESCRIPTION:Преподаватели: Иванов Иван Иванович\\, Петров Пётр Петрович\\nГруппы: fm-1\\, fm-2\\, fm-3"
+    )
+
+
+def test_output_is_byte_stable():
+    calendar: str = render_calendar("fm-1", _events(), SEMESTER)
+
+    # Ни время запуска, ни порядок событий на входе не влияют на содержимое
+    assert render_calendar("fm-1", list(reversed(_events())), SEMESTER) == calendar
+    assert re.findall(r"DTSTAMP:(\S+)", calendar) == ["20260902T000000Z"] * 4
+
+
+def test_namesake_teachers_get_separate_calendars():
+    namesake: dict = {"name": "Иван", "surname": "Иванов", "patronymic": "Иванович", "initials": "Иванов И.И."}
+    snapshot: dict[str, list[dict]] = {
+        "subjects": [{"id": 0, "name": "Алгебра", "type": None}],
+        "places": [{"id": 0, "name": "101"}],
+        "groups": [{"id": 0, "origin_name": "fm-1"}],
+        "teachers": [{"id": 0, **namesake}, {"id": 1, **namesake}],
+        "lessons": [
+            {"id": lesson_id, "week_mark": "every", "week_day": lesson_id, "lesson_number": 1, "groups_ids": [0],
+             "teachers_ids": [lesson_id], "subject_id": 0, "place_id": 0}
+            for lesson_id in (0, 1)
+        ],
+    }
+
+    calendars: dict[str, tuple[str, list[dict]]] = _collect_calendars(snapshot)
+    teachers_calendars: list[tuple[str, list[dict]]] = [
+        calendar for path, calendar in calendars.items() if path.startswith("teachers/")
+    ]
+
+    assert len(teachers_calendars) == 2
+    assert sorted(events[0]["week_day"] for _, events in teachers_calendars) == [0, 1]
+    assert {name for name, _ in teachers_calendars} == {"Иванов Иван Иванович"}
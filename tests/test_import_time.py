@@ -0,0 +1,55 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Бенчмарк ленивой загрузки: `-X importtime` выводит в stderr все импортированные модули. Ни справка, ни переэкспорт
+# снимка не должны тянуть парсеры (с их HTTP-стеком) и rapidfuzz
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _imported_modules(*args: str) -> list[str]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "tvgu_data_hub", *args],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    # Строки вида `import time:       self [us] |  cumulative | imported package`
+    return [
+        line.rsplit("|", 1)[1].strip()
+        for line in completed.stderr.splitlines() if line.startswith("import time:") and "|" in line
+    ]
+
+
+def _is_heavy_module(module: str) -> bool:
+    parts: list[str] = module.split(".")
+
+    # Парсеры - сабмодули пакета (`tvgu_data_hub.schedule_parser`) и их пакеты (`tvgu_schedule_parser`);
+    # стандартный `re._parser` сюда не относится
+    return parts[0] == "rapidfuzz" or (parts[0].startswith("tvgu_") and any(part.endswith("_parser") for part in parts))
+
+
+def _heavy_modules(modules: list[str]) -> list[str]:
+    return [module for module in modules if _is_heavy_module(module)]
+
+
+def test_help_does_not_import_parsers():
+    modules: list[str] = _imported_modules("--help")
+
+    assert "tvgu_data_hub.hub" in modules
+    assert _heavy_modules(modules) == []
+
+
+def test_snapshot_reexport_does_not_import_parsers(tmp_path):
+    snapshot_path: Path = tmp_path / "snapshot.json"
+    output_path: Path = tmp_path / "output.json"
+    snapshot: dict[str, list] = {
+        "departments": [], "structs": [], "teachers": [], "places": [], "subjects": [], "groups": [], "lessons": []
+    }
+    snapshot_path.write_text(json.dumps(snapshot), encoding="UTF-8")
+
+    modules: list[str] = _imported_modules("-s", str(snapshot_path), "-o", str(output_path))
+
+    assert _heavy_modules(modules) == []
+    assert json.loads(output_path.read_text(encoding="UTF-8")) == snapshot
@@ -0,0 +1,49 @@
+import asyncio
+import gc
+import tracemalloc
+
+from tests.synthetic import make_schedules, patch_fetchers
+from tvgu_data_hub.hub import TvGUInfo, get_all_tvgu_data
+
+# Пиковая память `get_all_tvgu_data` не должна превышать итоговый `TvGUInfo` больше чем во столько раз.
+# Если промежуточные этапы пар снова начнут жить одновременно, пик вырастет кратно числу копий
+# (на синтетических данных теста: ~4.9x до потоковой агрегации пар и ~3.0x после)
+PEAK_TO_RESULT_BUDGET = 3.75
+
+TEACHERS_INITIALS: tuple[str, ...] = tuple(f"Преподаватель{number} А.Б." for number in range(40))
+
+
+def _run(coroutine):
+    # Не `asyncio.run`: его обработка SIGINT может построить repr завершённой задачи, то есть всего `TvGUInfo`,
+    # и этот repr, а не сбор данных, определил бы пик
+    loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_get_all_tvgu_data_peak_memory(monkeypatch):
+    # Прогон на маленьких данных до замера: модули агрегации импортируются лениво, и без него их загрузка
+    # попала бы и в пик, и в итоговый объём, смазывая отношение
+    patch_fetchers(monkeypatch, make_schedules(faculties=1, groups_per_faculty=2, lessons_per_group=2,
+                                               teachers_initials=TEACHERS_INITIALS))
+    _run(get_all_tvgu_data())
+
+    # Входные данные создаются до замера: в реальном сборе они приходят от парсеров
+    patch_fetchers(monkeypatch, make_schedules(faculties=4, groups_per_faculty=60, lessons_per_group=40,
+                                               teachers_initials=TEACHERS_INITIALS))
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        info: TvGUInfo = _run(get_all_tvgu_data())
+        gc.collect()
+        result_size, peak_size = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert info.lessons
+    assert peak_size <= result_size * PEAK_TO_RESULT_BUDGET, (
+        f"Пик {peak_size} Б при итоговых данных {result_size} Б (x{peak_size / result_size:.2f})"
+    )
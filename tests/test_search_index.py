@@ -0,0 +1,47 @@
+import pytest
+
+from tvgu_data_hub.search_index import CANDIDATES_LIMIT, SearchIndex, build_search_index
+
+pytest.importorskip("rapidfuzz")
+
+LETTERS = "АБВГДЕЖЗИКЛМНОПРСТУФХЦЧШЭЮЯ"
+
+
+def _teachers_snapshot(initials: list[str]) -> dict[str, list[dict]]:
+    return {
+        "teachers": [{"id": teacher_id, "initials": value} for teacher_id, value in enumerate(initials)],
+        "subjects": [],
+        "groups": [],
+        "places": [],
+    }
+
+
+def _names(index: SearchIndex, query: str, limit: int = 100) -> list[str]:
+    return [document.name for document, _ in index.search(query, limit=limit)]
+
+
+def test_typo_query_keeps_common_matches():
+    # Редкая триграмма опечатки («аон») совпадает только с посторонним преподавателем, но все «Ивановы» делят
+    # с запросом три триграммы и должны остаться среди результатов
+    initials: list[str] = [f"Иванов {letter}.{letter}." for letter in LETTERS[:16]] + ["Клаонв Ф.Ф."]
+    names: list[str] = _names(build_search_index(_teachers_snapshot(initials)), "иваонв")
+
+    assert set(initials[:16]) <= set(names)
+
+
+def test_prefix_query_with_many_candidates():
+    # Кандидатов больше, чем `CANDIDATES_LIMIT`: частые триграммы уже не перебираются целиком,
+    # но точное совпадение всё равно находится
+    initials: list[str] = [
+        f"Иванов{suffix} {letter}.{letter}." for suffix in ("", "а", "ский") for letter in LETTERS
+    ] + ["Иванченко Ю.Ю."]
+    assert len(initials) > CANDIDATES_LIMIT
+
+    assert _names(build_search_index(_teachers_snapshot(initials)), "иванченко ю", limit=1) == ["Иванченко Ю.Ю."]
+
+
+def test_roundtrip(tmp_path):
+    index: SearchIndex = build_search_index(_teachers_snapshot(["Петров П.П.", "Сидоров С.С."]))
+    index.dump(tmp_path / "index.json")
+
+    assert _names(SearchIndex.load(tmp_path / "index.json"), "петров") == _names(index, "петров")
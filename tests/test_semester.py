@@ -0,0 +1,65 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from tvgu_data_hub.semester import Semester, iter_lesson_dates, week_mark_parities
+
+# Семестр начинается в среду: неделя 31.08-06.09 - нулевая, хотя её понедельник в семестр не входит
+SEMESTER = Semester(start=date(2026, 9, 2), end=date(2026, 9, 30))
+
+
+def _week_mark(name: str):
+    # Чётности задаются по именам членов `WeekMark`, поэтому без сабмодуля парсера расписания тесты пропускаются
+    consts = pytest.importorskip("tvgu_data_hub.schedule_parser.tvgu_schedule_parser.consts")
+    return consts.WeekMark[name]
+
+
+def test_semester_start_after_end():
+    with pytest.raises(ValueError):
+        Semester(start=date(2026, 9, 30), end=date(2026, 9, 1))
+
+
+def test_week_parity():
+    assert SEMESTER.first_monday == date(2026, 8, 31)
+    assert [SEMESTER.week_parity(date(2026, 9, day)) for day in (2, 6, 7, 13, 14, 20, 21)] == [0, 0, 1, 1, 0, 0, 1]
+
+
+def test_lesson_bounds():
+    start, end = SEMESTER.lesson_bounds(date(2026, 9, 7), 3)
+    moscow: timezone = timezone(timedelta(hours=3))
+
+    assert start == datetime(2026, 9, 7, 12, 10, tzinfo=moscow)
+    assert end == datetime(2026, 9, 7, 13, 45, tzinfo=moscow)
+
+    with pytest.raises(KeyError):
+        SEMESTER.lesson_bounds(date(2026, 9, 7), 99)
+
+
+@pytest.mark.parametrize("name, week_day, expected_days", [
+    ("EVERY", 0, [7, 14, 21, 28]),
+    ("PLUS", 0, [14, 28]),
+    ("MINUS", 0, [7, 21]),
+    ("PLUS", 2, [2, 16, 30]),
+    ("MINUS", 2, [9, 23]),
+])
+def test_iter_lesson_dates(name, week_day, expected_days):
+    week_mark = _week_mark(name)
+    expected: list[date] = [date(2026, 9, day) for day in expected_days]
+
+    assert list(iter_lesson_dates(week_mark, week_day, SEMESTER)) == expected
+    # В JSON-экспорте отметка хранится значением перечисления
+    assert list(iter_lesson_dates(week_mark.value, week_day, SEMESTER)) == expected
+
+
+def test_every_week_mark_has_parities():
+    consts = pytest.importorskip("tvgu_data_hub.schedule_parser.tvgu_schedule_parser.consts")
+
+    for week_mark in consts.WeekMark:
+        assert week_mark_parities(week_mark)
+
+
+def test_unknown_week_mark():
+    pytest.importorskip("tvgu_data_hub.schedule_parser.tvgu_schedule_parser.consts")
+
+    with pytest.raises(KeyError):
+        week_mark_parities("неизвестная отметка")
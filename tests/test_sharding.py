@@ -0,0 +1,64 @@
+from dataclasses import replace
+
+from tests.synthetic import make_group, make_lesson, make_schedules, make_teacher
+from tvgu_data_hub.creator_fk import PK, create_entities_pks
+from tvgu_data_hub.normalizer import lessons_normalize, normalize_teachers_for_lessons
+from tvgu_data_hub.sharding import prepare_lessons_sharded
+
+TEACHERS = [
+    make_teacher("Иванов", "Иван", "Иванович"),
+    make_teacher("Петров", "Пётр", "Петрович"),
+    make_teacher("Сидорова", "Анна", "Сергеевна"),
+]
+# Инициалы встречаются в расписаниях всех факультетов; последние - с опечаткой и без точного совпадения
+SCHEDULE_INITIALS: tuple[str, ...] = ("Иванов И.И.", "Петров П.П.", "Сидорова А.С.", "Неизвестный Н.Н.", "Ивaнов И.И.")
+
+
+def _make_schedules():
+    schedules = make_schedules(faculties=3, groups_per_faculty=8, lessons_per_group=12,
+                               teachers_initials=SCHEDULE_INITIALS)
+
+    # Потоковая лекция двух факультетов: в расписаниях разные наборы преподавателей, объединяются при слиянии шардов
+    shared_lessons = (
+        ("f0", make_lesson(1, 1, "Философия", "Актовый зал", ("Петров П.П.", "Иванов И.И."))),
+        ("f1", make_lesson(1, 1, "Философия", "Актовый зал", ("Иванов И.И.", "Сидорова А.С."))),
+        ("f2", make_lesson(1, 1, "Философия", "Актовый зал", ())),
+    )
+
+    for faculty_code, lesson in shared_lessons:
+        schedules[faculty_code][make_group(faculty_code, 100)] = [lesson]
+
+    return schedules
+
+
+def _as_comparable(lessons_pks: dict[tuple, PK]) -> list:
+    # Порядок групп в паре берётся из множества, поэтому группы сравниваются без учёта порядка
+    return [
+        (key, lesson_pk.id, replace(lesson_pk.entity, groups=()), set(lesson_pk.entity.groups))
+        for key, lesson_pk in lessons_pks.items()
+    ]
+
+
+def test_sharded_matches_single_process():
+    single_report: dict = {}
+    single: dict[tuple, PK] = normalize_teachers_for_lessons(
+        create_entities_pks(lessons_normalize(_make_schedules()), custom_key_getter=lambda lesson: lesson._identify()),
+        TEACHERS,
+        single_report
+    )
+
+    sharded_report: dict = {}
+    sharded: dict[tuple, PK] = prepare_lessons_sharded(_make_schedules(), TEACHERS, 2, sharded_report)
+
+    assert _as_comparable(sharded) == _as_comparable(single)
+    assert sharded_report == single_report
+
+
+def test_shared_lesson_merged_across_faculties():
+    sharded: dict[tuple, PK] = prepare_lessons_sharded(_make_schedules(), TEACHERS, 2)
+
+    shared = [lesson_pk.entity for lesson_pk in sharded.values() if lesson_pk.entity.subject_name == "Философия"]
+
+    assert len(shared) == 1
+    assert {group.faculty_code for group in shared[0].groups} == {"f0", "f1", "f2"}
+    assert [teacher.initials for teacher in shared[0].teachers] == ["Петров П.П.", "Иванов И.И.", "Сидорова А.С."]
@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+from tvgu_data_hub.shards_export import export_shards
+
+NAMESAKE: dict = {"name": "Иван", "surname": "Иванов", "patronymic": "Иванович", "initials": "Иванов И.И."}
+
+
+def _snapshot() -> dict[str, list[dict]]:
+    return {
+        "departments": [],
+        "structs": [{"id": 0, "name": "Факультет математики", "code": "fm", "boss_id": None, "groups_ids": [0],
+                     "departments_ids": []}],
+        # Одноимённые преподаватели: отображаемое имя одно, естественные ключи различаются номером вхождения
+        "teachers": [{"id": 0, **NAMESAKE}, {"id": 1, **NAMESAKE}],
+        "places": [{"id": 0, "name": "101"}],
+        "subjects": [{"id": 0, "name": "Алгебра", "type": None}, {"id": 1, "name": "Геометрия", "type": None}],
+        "subject_aliases": [],
+        "groups": [{"id": 0, "origin_name": "fm-1", "struct_id": 0}],
+        "lessons": [
+            {"id": lesson_id, "week_mark": "every", "week_day": 0, "lesson_number": lesson_id + 1,
+             "groups_ids": [0], "teachers_ids": [lesson_id], "subject_id": lesson_id, "place_id": 0}
+            for lesson_id in (0, 1)
+        ],
+    }
+
+
+def test_namesake_teachers_get_separate_shards(tmp_path):
+    result = export_shards(_snapshot(), tmp_path, max_workers=1)
+
+    teachers_paths: list[str] = sorted(path for path in result.written if path.startswith("teachers/"))
+    assert len(teachers_paths) == 2
+
+    subjects: list[list[str]] = [
+        [subject["name"] for subject in json.loads((tmp_path / path).read_text(encoding="UTF-8"))["subjects"]]
+        for path in teachers_paths
+    ]
+    assert sorted(subjects) == [["Алгебра"], ["Геометрия"]]
+
+
+def test_unchanged_shards_are_not_rewritten(tmp_path):
+    export_shards(_snapshot(), tmp_path, max_workers=1)
+    contents: dict[Path, bytes] = {path: path.read_bytes() for path in tmp_path.rglob("*.json")}
+
+    result = export_shards(_snapshot(), tmp_path, max_workers=1)
+
+    assert result.written == [] and result.removed == []
+    assert {path: path.read_bytes() for path in tmp_path.rglob("*.json")} == contents
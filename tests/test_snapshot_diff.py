@@ -0,0 +1,140 @@
+import copy
+import json
+
+from tvgu_data_hub.snapshot_diff import apply_patch, diff_snapshots
+
+
+def _snapshot() -> dict[str, list[dict]]:
+    return {
+        "departments": [{"id": 0, "name": "Кафедра алгебры", "boss_id": 0, "boss_jobs": None, "struct_id": 0}],
+        "structs": [{"id": 0, "name": "Факультет математики", "code": "fm", "boss_id": 1, "groups_ids": [0, 1],
+                     "departments_ids": [0]}],
+        "teachers": [
+            {"id": 0, "name": "Иван", "surname": "Иванов", "patronymic": "Иванович", "initials": "Иванов И.И.",
+             "has_lessons": True},
+            {"id": 1, "name": "Пётр", "surname": "Петров", "patronymic": "Петрович", "initials": "Петров П.П.",
+             "has_lessons": True},
+            # Одноимённые преподаватели без полного ФИО различаются только номером вхождения ключа
+            {"id": 2, "initials": "Сидоров С.С.", "role": None, "has_lessons": True},
+            {"id": 3, "initials": "Сидоров С.С.", "role": "ассистент", "has_lessons": False},
+        ],
+        "places": [{"id": 0, "name": "101", "is_link": False}, {"id": 1, "name": "202", "is_link": False}],
+        "subjects": [{"id": 0, "name": "Алгебра", "type": "lecture"},
+                     {"id": 1, "name": "Математический анализ", "type": "lecture"}],
+        "subject_aliases": [{"name": "Мат. анализ", "type": "lecture", "subject_id": 1}],
+        "groups": [{"id": 0, "origin_name": "fm-1", "struct_id": 0, "has_schedule": True},
+                   {"id": 1, "origin_name": "fm-2", "struct_id": 0, "has_schedule": True}],
+        "lessons": [
+            {"id": 0, "week_mark": "every", "week_day": 0, "lesson_number": 1, "groups_ids": [0, 1],
+             "teachers_ids": [0], "subject_id": 0, "place_id": 0},
+            {"id": 1, "week_mark": "every", "week_day": 1, "lesson_number": 2, "groups_ids": [1],
+             "teachers_ids": [1, 2], "subject_id": 1, "place_id": 1},
+        ],
+    }
+
+
+def _renumbered(snapshot: dict[str, list[dict]], shift: int = 10) -> dict[str, list[dict]]:
+    """
+    Тот же снимок с другими идентификаторами и в обратном порядке записей. Порядок преподавателей сохраняется:
+    одноимённые записи различаются номером вхождения, который зависит от порядка
+    """
+
+    references: dict[str, tuple[str, ...]] = {
+        "departments": ("boss_id", "struct_id"), "structs": ("boss_id", "groups_ids", "departments_ids"),
+        "subject_aliases": ("subject_id",), "groups": ("struct_id",),
+        "lessons": ("groups_ids", "teachers_ids", "subject_id", "place_id"),
+    }
+    renumbered: dict[str, list[dict]] = copy.deepcopy(snapshot)
+
+    for name, records in renumbered.items():
+        for record in records:
+            if "id" in record:
+                record["id"] += shift
+            for field_name in references.get(name, ()):
+                value = record[field_name]
+                record[field_name] = [ref_id + shift for ref_id in value] if isinstance(value, list) else value + shift
+        if name != "teachers":
+            records.reverse()
+
+    return renumbered
+
+
+def _json_roundtrip(data):
+    return json.loads(json.dumps(data, ensure_ascii=False))
+
+
+def _is_empty(patch) -> bool:
+    return patch == {"collections": {}}
+
+
+def test_diff_with_itself_is_empty():
+    assert _is_empty(diff_snapshots(_snapshot(), _snapshot()))
+
+
+def test_renumbered_ids_are_not_changes():
+    assert _is_empty(diff_snapshots(_snapshot(), _renumbered(_snapshot())))
+
+
+def test_apply_reproduces_new_snapshot():
+    old: dict[str, list[dict]] = _snapshot()
+    new: dict[str, list[dict]] = _renumbered(_snapshot(), shift=3)
+    teachers: dict[str, dict] = {teacher["initials"]: teacher for teacher in new["teachers"]}
+
+    # Изменённые преподаватель и место
+    teachers["Иванов И.И."]["has_lessons"] = False
+    new["places"][0]["is_link"] = True
+    # Добавленные преподаватель, место и пара, удалённая пара
+    new["teachers"].append({"id": 100, "name": "Анна", "surname": "Смирнова", "patronymic": "Сергеевна",
+                            "initials": "Смирнова А.С.", "has_lessons": True})
+    new["places"].append({"id": 100, "name": "https://meet.example/lesson", "is_link": True})
+    new["lessons"] = [lesson for lesson in new["lessons"] if lesson["week_day"] != 1]
+    new["lessons"].append({"id": 100, "week_mark": "plus", "week_day": 3, "lesson_number": 4, "groups_ids": [3],
+                           "teachers_ids": [100], "subject_id": 4, "place_id": 100})
+    # Удалённые преподаватель (с номером вхождения в ключе) и место
+    new["teachers"] = [teacher for teacher in new["teachers"] if teacher.get("role") != "ассистент"]
+    new["places"] = [place for place in new["places"] if place["name"] != "202"]
+
+    patch = _json_roundtrip(diff_snapshots(old, new))
+
+    assert set(patch["collections"]) == {"teachers", "places", "lessons"}
+    assert len(patch["collections"]["lessons"]["added"]) == 1
+    assert len(patch["collections"]["lessons"]["removed"]) == 1
+
+    applied = _json_roundtrip(apply_patch(_json_roundtrip(old), patch))
+
+    assert _is_empty(diff_snapshots(applied, new))
+
+
+def test_apply_keeps_existing_ids():
+    old: dict[str, list[dict]] = _snapshot()
+    new: dict[str, list[dict]] = _renumbered(_snapshot())
+    new["places"].append({"id": 100, "name": "303", "is_link": False})
+
+    applied = apply_patch(old, _json_roundtrip(diff_snapshots(old, new)))
+
+    assert [(place["id"], place["name"]) for place in applied["places"]] == [(0, "101"), (1, "202"), (2, "303")]
+    assert applied["lessons"] == old["lessons"]
+
+
+def test_subject_aliases_survive_apply():
+    old: dict[str, list[dict]] = _snapshot()
+    new: dict[str, list[dict]] = _renumbered(_snapshot())
+    new["subject_aliases"].append({"name": "Алгебра и геометрия", "type": "lecture", "subject_id": 10})
+
+    applied = apply_patch(old, _json_roundtrip(diff_snapshots(old, new)))
+
+    assert applied["subject_aliases"] == [
+        {"name": "Мат. анализ", "type": "lecture", "subject_id": 1},
+        {"name": "Алгебра и геометрия", "type": "lecture", "subject_id": 0},
+    ]
+    assert _is_empty(diff_snapshots(applied, new))
+
+
+def test_old_snapshot_without_aliases():
+    old: dict[str, list[dict]] = _snapshot()
+    del old["subject_aliases"]
+
+    patch = diff_snapshots(old, _snapshot())
+
+    assert set(patch["collections"]) == {"subject_aliases"}
+    assert apply_patch(old, patch)["subject_aliases"] == _snapshot()["subject_aliases"]
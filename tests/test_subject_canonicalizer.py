@@ -0,0 +1,76 @@
+import pytest
+
+from tvgu_data_hub.subject_canonicalizer import canonicalize_subjects, is_abbreviation
+
+
+@pytest.mark.parametrize("short_name, full_name", [
+    ("Мат. анализ", "Математический анализ"),
+    ("Мат анализ", "Математический анализ"),
+    ("Ин. яз.", "Иностранный язык"),
+    ("Теория вероятн. и мат. статистика", "Теория вероятностей и математическая статистика"),
+])
+def test_abbreviation(short_name, full_name):
+    assert is_abbreviation(short_name, full_name)
+    assert not is_abbreviation(full_name, short_name)
+
+
+@pytest.mark.parametrize("short_name, full_name", [
+    # Названия из одного слова не сокращаются
+    ("Право", "Правоведение"),
+    ("История", "Историография"),
+    ("Мат.", "Математика"),
+    # Без точки слово должно быть явно усечённым
+    ("История России", "Историография России"),
+    ("Ин яз", "Иностранный язык"),
+    ("Математический анализ", "Математический анализ"),
+])
+def test_not_abbreviation(short_name, full_name):
+    assert not is_abbreviation(short_name, full_name)
+
+
+def test_variants_merged_into_canonical():
+    aliases = canonicalize_subjects({
+        ("Математический анализ", "lecture"): 5,
+        ("Мат. анализ", "lecture"): 2,
+        ("Математический  анализ,", "lecture"): 1,
+        ("Мат. анализ", "practice"): 1,
+        ("Веб-программирование", "lecture"): 2,
+        ("Веб программирование", "lecture"): 1,
+        ("Вебпрограммирование", "lecture"): 1,
+    })
+
+    assert aliases == {
+        ("Мат. анализ", "lecture"): ("Математический анализ", "lecture"),
+        ("Математический  анализ,", "lecture"): ("Математический анализ", "lecture"),
+        ("Веб программирование", "lecture"): ("Веб-программирование", "lecture"),
+        ("Вебпрограммирование", "lecture"): ("Веб-программирование", "lecture"),
+    }
+
+
+def test_distinct_subjects_not_merged():
+    assert canonicalize_subjects({
+        ("Право", "lecture"): 3,
+        ("Правоведение", "lecture"): 2,
+        ("История", "lecture"): 1,
+        ("Историография", "lecture"): 1,
+        ("История России", "lecture"): 1,
+        ("Историография России", "lecture"): 1,
+        # Названия различаются префиксом или номером, хотя посимвольно почти совпадают
+        ("Неорганическая химия", "lecture"): 1,
+        ("Органическая химия", "lecture"): 1,
+        ("Макроэкономика", "lecture"): 1,
+        ("Микроэкономика", "lecture"): 1,
+        ("Математический анализ 2", "lecture"): 1,
+        ("Математический анализ 1", "lecture"): 1,
+        ("История России XX века", "lecture"): 1,
+        ("История России XIX века", "lecture"): 1,
+    }) == {}
+
+
+def test_ambiguous_abbreviation_not_merged():
+    # Сокращение подходит к двум разным предметам и не должно их объединять
+    assert canonicalize_subjects({
+        ("Мат. анализ", "lecture"): 1,
+        ("Математический анализ", "lecture"): 4,
+        ("Материальный анализ", "lecture"): 2,
+    }) == {}
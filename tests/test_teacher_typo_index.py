@@ -0,0 +1,98 @@
+import pytest
+
+from tvgu_data_hub import teacher_typo_index
+from tvgu_data_hub.teacher_typo_index import LazyTeachersTypoIndex, build_teachers_typo_index, fold_initials
+
+pytest.importorskip("rapidfuzz")
+
+INITIALS_KEYS: list[str] = ["иванов и.и.", "иванов а.б.", "петров п.п.", "петрова п.п.", "козлов к.к."]
+
+
+def test_fold_initials():
+    assert fold_initials("Kозлов К. К.") == ("кк", "козлов")
+    assert fold_initials("Иванов И.И.") == fold_initials("иванов  и.и")
+    assert fold_initials("") is None
+
+
+def test_homoglyphs_match_exactly():
+    index = build_teachers_typo_index(INITIALS_KEYS, 1)
+
+    # Латинские «K», «o» и «a» вместо кириллических
+    assert index.lookup("Kозлов К.К.") == (["козлов к.к."], 0)
+    assert index.lookup("Ивaнов И.И.") == (["иванов и.и."], 0)
+
+
+def test_surname_typo_within_distance():
+    index = build_teachers_typo_index(INITIALS_KEYS, 1)
+
+    assert index.lookup("Ивановв И.И.") == (["иванов и.и."], 1)
+    # У латинской «z» нет кириллического двойника, это обычная опечатка
+    assert index.lookup("Kozлов К.К.") == (["козлов к.к."], 1)
+    assert index.lookup("Иванофф И.И.") is None
+    # Равно близкие фамилии возвращаются вместе - дальше их разбирают эвристики
+    assert sorted(index.lookup("Петровы П.П.")[0]) == ["петров п.п.", "петрова п.п."]
+
+
+def test_name_letters_must_match():
+    index = build_teachers_typo_index(INITIALS_KEYS, 1)
+
+    assert index.lookup("Иванов И.Б.") is None
+    assert index.lookup("Козлов К.") is None
+
+
+def test_zero_distance_disables_typos():
+    index = build_teachers_typo_index(INITIALS_KEYS, 0)
+
+    assert index.lookup("Ивановв И.И.") is None
+    assert index.lookup("Ивaнов И.И.") == (["иванов и.и."], 0)
+
+
+def test_lazy_index_builds_on_first_lookup(monkeypatch):
+    builds: list[int] = []
+    build = teacher_typo_index.build_teachers_typo_index
+
+    def counting_build(*args, **kwargs):
+        builds.append(1)
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(teacher_typo_index, "build_teachers_typo_index", counting_build)
+    index = LazyTeachersTypoIndex(initials_keys=INITIALS_KEYS, max_distance=1)
+
+    assert builds == []
+    assert index.lookup("Ивановв И.И.") == (["иванов и.и."], 1)
+    assert index.lookup("Kозлов К.К.") == (["козлов к.к."], 0)
+    assert builds == [1]
+
+
+def test_typo_report(monkeypatch):
+    from tests.synthetic import make_group, make_lesson, make_teacher
+    from tvgu_data_hub.creator_fk import create_entities_pks
+    from tvgu_data_hub.normalizer import lessons_normalize, normalize_teachers_for_lessons
+
+    teachers = [make_teacher("Иванов", "Иван", "Иванович"), make_teacher("Козлов", "Кирилл", "Константинович")]
+
+    def normalize(*teachers_initials: str) -> tuple[list, dict]:
+        schedules = {"f0": {make_group("f0", 0): [make_lesson(1, 1, "Алгебра", "101", teachers_initials)]}}
+        report: dict = {}
+        lessons_pks = normalize_teachers_for_lessons(
+            create_entities_pks(lessons_normalize(schedules), custom_key_getter=lambda lesson: lesson._identify()),
+            teachers,
+            report
+        )
+        return [teacher for lesson_pk in lessons_pks.values() for teacher in lesson_pk.entity.teachers], report
+
+    resolved, report = normalize("Ивановв И.И.", "Kозлов К.К.", "Иванов И.И.")
+
+    assert resolved == [teachers[0], teachers[1], teachers[0]]
+    assert {source: (match.matched, match.distance) for source, match in report.items()} == {
+        "Ивановв И.И.": (("Иванов И.И.",), 1),
+        "Kозлов К.К.": (("Козлов К.К.",), 0),
+    }
+
+    # Когда все инициалы находятся точно, индекс опечаток не строится
+    def failing_build(*args, **kwargs):
+        raise AssertionError("Индекс опечаток не должен строиться")
+
+    monkeypatch.setattr(teacher_typo_index, "build_teachers_typo_index", failing_build)
+
+    assert normalize("Иванов И.И.", "Козлов К.К.") == ([teachers[0], teachers[1]], {})
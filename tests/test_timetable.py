@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta, timezone
+
+from tests.synthetic import make_dataclass
+from tvgu_data_hub.hub import TvGUInfo
+from tvgu_data_hub.schedule_parser.tvgu_schedule_parser.consts import WeekMark
+from tvgu_data_hub.semester import Semester
+from tvgu_data_hub.timetable import Timetable, TimetableEntry, build_timetable
+from tvgu_data_hub.types import LessonAggregated
+
+# Семестр начинается в среду: понедельник 31.08 в него не входит, понедельники 07.09 и 21.09 - нечётные недели
+SEMESTER = Semester(start=date(2026, 9, 2), end=date(2026, 9, 30))
+MOSCOW = timezone(timedelta(hours=3))
+
+
+def _lesson(lesson_id: int, week_mark: WeekMark, week_day: int, lesson_number: int, groups_ids: tuple[int, ...],
+            teachers_ids: tuple[int, ...]) -> LessonAggregated:
+    return make_dataclass(
+        LessonAggregated, id=lesson_id, week_mark=week_mark, week_day=week_day, lesson_number=lesson_number,
+        groups_ids=groups_ids, teachers_ids=teachers_ids, subject_id=0, place_id=0
+    )
+
+
+def _timetable() -> Timetable:
+    lessons: list[LessonAggregated] = [
+        # Порядок на входе не совпадает с порядком номеров пар
+        _lesson(1, WeekMark.PLUS, 0, 3, (0, 1), (11,)),
+        _lesson(0, WeekMark.EVERY, 0, 1, (0,), (10,)),
+        _lesson(2, WeekMark.MINUS, 0, 2, (1,), (10,)),
+        _lesson(3, WeekMark.EVERY, 2, 7, (0,), ()),
+    ]
+    data: TvGUInfo = TvGUInfo(
+        departments=[], structs=[], teachers=[], places=[], subjects=[], groups=[], lessons=lessons
+    )
+
+    return build_timetable(data, SEMESTER)
+
+
+def _ids(entries) -> list[int]:
+    return [entry.lesson.id for entry in entries]
+
+
+def test_odd_and_even_weeks():
+    timetable: Timetable = _timetable()
+
+    assert _ids(timetable.lessons_on(date(2026, 9, 7))) == [0, 2]
+    assert _ids(timetable.lessons_on(date(2026, 9, 14))) == [0, 1]
+    assert _ids(timetable.lessons_on(date(2026, 9, 8))) == []
+
+
+def test_entries_times():
+    entries: list[TimetableEntry] = list(_timetable().lessons_on(date(2026, 9, 7)))
+
+    assert [(entry.start, entry.end) for entry in entries] == [
+        (datetime(2026, 9, 7, 8, 30, tzinfo=MOSCOW), datetime(2026, 9, 7, 10, 5, tzinfo=MOSCOW)),
+        (datetime(2026, 9, 7, 10, 15, tzinfo=MOSCOW), datetime(2026, 9, 7, 11, 50, tzinfo=MOSCOW)),
+    ]
+
+
+def test_days_outside_semester():
+    timetable: Timetable = _timetable()
+
+    assert _ids(timetable.lessons_on(date(2026, 8, 31))) == []
+    assert _ids(timetable.lessons_on(date(2026, 10, 5))) == []
+
+
+def test_group_and_teacher_filters():
+    timetable: Timetable = _timetable()
+
+    assert _ids(timetable.lessons_on(date(2026, 9, 14), group_id=1)) == [1]
+    assert _ids(timetable.lessons_on(date(2026, 9, 7), teacher_id=10)) == [0, 2]
+    assert _ids(timetable.lessons_on(date(2026, 9, 7), teacher_id=11)) == []
+    assert _ids(timetable.lessons_on(date(2026, 9, 14), group_id=0, teacher_id=11)) == [1]
+
+
+def test_lessons_between():
+    timetable: Timetable = _timetable()
+    entries: list[TimetableEntry] = list(timetable.lessons_between(date(2026, 8, 20), date(2026, 9, 9)))
+
+    # Начало диапазона обрезается началом семестра; пары идут по времени начала
+    assert _ids(entries) == [3, 0, 2, 3]
+    assert [entry.start for entry in entries] == sorted(entry.start for entry in entries)
+    assert entries[0].start == datetime(2026, 9, 2, 19, 15, tzinfo=MOSCOW)
+
+    # Диапазон шире семестра: 4 понедельника по 2 пары и 5 сред по одной
+    assert len(list(timetable.lessons_between(date.min, date.max))) == 13
+    assert _ids(timetable.lessons_between(date(2026, 9, 1), date(2026, 9, 30), group_id=1)) == [2, 1, 2, 1]
@@ -1,13 +1,17 @@
 import argparse
 import asyncio
 import json
+import sys
 from dataclasses import dataclass, asdict
 from datetime import date
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 from .hub import get_all_tvgu_data, TvGUInfo
 from .misc import CustomEncoder
+from .snapshot import SnapshotDict, load_snapshot
+from .snapshot_diff import Patch, diff_snapshots, apply_patch
+from .teacher_typo_index import TeacherTypoMatch
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -16,23 +20,107 @@ class Args:
     output: Optional[str]
     output_directory: Optional[str]
     output_auto: Optional[str]
-
-
-def dump_tvgu_data(data: TvGUInfo, output_path: str, prettify: bool) -> None:
-    json.dump(
-        asdict(data),
-        open(output_path, "w+", encoding="UTF-8"),
+    snapshot: Optional[str]
+    command: Optional[str]
+    inputs: tuple[str, ...]
+    semester_start: Optional[date]
+    semester_end: Optional[date]
+    jobs: Optional[int]
+    aggregation_jobs: Optional[int]
+    search_index: bool
+
+
+def dump_tvgu_data(data: Union[TvGUInfo, SnapshotDict, Patch], output_path: Optional[str], prettify: bool) -> None:
+    dumped: str = json.dumps(
+        asdict(data) if isinstance(data, TvGUInfo) else data,
         ensure_ascii=False,
         indent=2 if prettify else None,
         cls=CustomEncoder
     )
 
+    if output_path is None:
+        print(dumped)
+        return
+
+    with open(output_path, "w+", encoding="UTF-8") as file:
+        file.write(dumped)
+
+
+def run_snapshot_command(args: Args) -> None:
+    if args.command == "diff":
+        old_path, new_path = args.inputs
+        result: Union[SnapshotDict, Patch] = diff_snapshots(load_snapshot(old_path), load_snapshot(new_path))
+    elif args.command == "apply":
+        snapshot_path, patch_path = args.inputs
+        result: Union[SnapshotDict, Patch] = apply_patch(load_snapshot(snapshot_path), load_snapshot(patch_path))
+    else:
+        raise ValueError(f"Неизвестная команда: {args.command}")
+
+    dump_tvgu_data(result, args.output, args.prettify)
+
+
+async def load_tvgu_data(args: Args) -> Union[TvGUInfo, SnapshotDict]:
+    if args.snapshot is not None:
+        # Работа с сохранённым снимком: ни парсеры, ни агрегация не импортируются
+        return load_snapshot(args.snapshot)
+
+    teachers_typo_report: dict[str, TeacherTypoMatch] = {}
+    data: TvGUInfo = await get_all_tvgu_data(args.aggregation_jobs, teachers_typo_report)
+
+    # Сопоставления с опечатками стоит проверить вручную, поэтому они выводятся отдельно от данных
+    for typo_match in teachers_typo_report.values():
+        print(
+            f"Преподаватель «{typo_match.source}» сопоставлен с опечаткой: "
+            f"{', '.join(typo_match.matched)} (расстояние {typo_match.distance})",
+            file=sys.stderr
+        )
+
+    return data
+
+
+def run_ics_command(args: Args, data: Union[TvGUInfo, SnapshotDict]) -> None:
+    # Пул процессов нужен только для экспорта календарей
+    from .ics_export import IcsExportResult, export_ics
+    from .semester import Semester
+
+    (directory,) = args.inputs
+    result: IcsExportResult = export_ics(
+        data, directory, Semester(start=args.semester_start, end=args.semester_end), args.jobs
+    )
+
+    print(
+        f"Календари: записано {len(result.written)}, без изменений {len(result.unchanged)}, "
+        f"не пересчитывались {len(result.skipped)}, удалено {len(result.removed)}"
+    )
+
+
+def run_shards_command(args: Args, data: Union[TvGUInfo, SnapshotDict]) -> None:
+    from .shards_export import ShardsExportResult, export_shards
+
+    (directory,) = args.inputs
+    result: ShardsExportResult = export_shards(data, directory, args.jobs, args.prettify)
+
+    print(
+        f"Шарды: записано {len(result.written)}, без изменений {len(result.unchanged)}, удалено {len(result.removed)}"
+    )
+
 
 async def main(args: Args) -> None:
-    all_data: TvGUInfo = await get_all_tvgu_data()
+    if args.command in ("diff", "apply"):
+        run_snapshot_command(args)
+        return
+
+    all_data: Union[TvGUInfo, SnapshotDict] = await load_tvgu_data(args)
+
+    if args.command == "ics":
+        run_ics_command(args, all_data)
+        return
+    if args.command == "shards":
+        run_shards_command(args, all_data)
+        return
 
     if args.output is not None or args.output_auto:
-        if args.output_auto is not None:
+        if args.output_auto:
             output_path: str = f"all_tvgu_data-{date.today()}.json"
         else:
             output_path: str = args.output
@@ -44,6 +132,12 @@ async def main(args: Args) -> None:
 
         dump_tvgu_data(all_data, output_path, args.prettify)
 
+        if args.search_index:
+            from .search_index import build_search_index
+
+            # Индекс кладётся рядом с экспортом: all_tvgu_data.json -> all_tvgu_data.search.json
+            build_search_index(all_data).dump(Path(output_path).with_suffix(".search.json"))
+
 
 def parse_args() -> Args:
     parser = argparse.ArgumentParser(description="Парсер всей информации ТвГУ")
@@ -53,14 +147,74 @@ def parse_args() -> Args:
     parser.add_argument("-oa", "--output-auto", action="store_true",
                         help="Автоматическое формирование имени выходного файла в виде даты")
     parser.add_argument("-p", "--prettify", action="store_true", help="Форматированный вывод JSON")
+    parser.add_argument("-s", "--snapshot",
+                        help="Путь к сохранённому экспорту, который нужно переэкспортировать вместо сбора данных")
+    parser.add_argument("-aj", "--aggregation-jobs", type=int,
+                        help="Количество процессов для пофакультетной нормализации пар (по умолчанию - один процесс)")
+    parser.add_argument("-si", "--search-index", action="store_true",
+                        help="Сохранить рядом с экспортом поисковый индекс (преподаватели, дисциплины, группы, места)")
+
+    subparsers = parser.add_subparsers(dest="command")
+
+    # Параметры, общие с основным парсером, можно указывать и до, и после команды. Без `SUPPRESS` подпарсер
+    # записал бы свои значения по умолчанию поверх указанных до команды (например, `-s снимок ics ...` терял снимок)
+
+    diff_parser = subparsers.add_parser("diff", help="Патч с изменениями между двумя снимками")
+    diff_parser.add_argument("old", help="Путь к старому снимку")
+    diff_parser.add_argument("new", help="Путь к новому снимку")
+
+    apply_parser = subparsers.add_parser("apply", help="Применение патча к снимку")
+    apply_parser.add_argument("base", help="Путь к снимку")
+    apply_parser.add_argument("patch", help="Путь к патчу, полученному командой diff")
+
+    for subparser in (diff_parser, apply_parser):
+        subparser.add_argument("-o", "--output", default=argparse.SUPPRESS,
+                               help="Путь к выходному файлу (по умолчанию - стандартный вывод)")
+        subparser.add_argument("-p", "--prettify", action="store_true", default=argparse.SUPPRESS,
+                               help="Форматированный вывод JSON")
+
+    ics_parser = subparsers.add_parser("ics", help="Экспорт календарей iCalendar по группам и преподавателям")
+    ics_parser.add_argument("directory", help="Путь к директории для календарей")
+    ics_parser.add_argument("--semester-start", type=date.fromisoformat, required=True,
+                            help="Дата начала семестра (ГГГГ-ММ-ДД)")
+    ics_parser.add_argument("--semester-end", type=date.fromisoformat, required=True,
+                            help="Дата окончания семестра (ГГГГ-ММ-ДД)")
+    ics_parser.add_argument("-s", "--snapshot", default=argparse.SUPPRESS,
+                            help="Путь к сохранённому экспорту вместо сбора данных")
+    ics_parser.add_argument("-j", "--jobs", type=int, help="Количество процессов (по умолчанию - по числу ядер)")
+
+    shards_parser = subparsers.add_parser("shards", help="Отдельные JSON по группам, преподавателям и местам")
+    shards_parser.add_argument("directory", help="Путь к директории для шардов")
+    shards_parser.add_argument("-s", "--snapshot", default=argparse.SUPPRESS,
+                               help="Путь к сохранённому экспорту вместо сбора данных")
+    shards_parser.add_argument("-j", "--jobs", type=int, help="Количество процессов (по умолчанию - по числу ядер)")
+    shards_parser.add_argument("-p", "--prettify", action="store_true", default=argparse.SUPPRESS,
+                               help="Форматированный вывод JSON")
 
     args: argparse.Namespace = parser.parse_args()
 
+    if args.command == "diff":
+        inputs: tuple[str, ...] = (args.old, args.new)
+    elif args.command == "apply":
+        inputs: tuple[str, ...] = (args.base, args.patch)
+    elif args.command in ("ics", "shards"):
+        inputs: tuple[str, ...] = (args.directory,)
+    else:
+        inputs: tuple[str, ...] = ()
+
     return Args(
         prettify=args.prettify,
         output=args.output,
         output_directory=args.output_directory,
-        output_auto=args.output_auto
+        output_auto=args.output_auto,
+        snapshot=args.snapshot,
+        command=args.command,
+        inputs=inputs,
+        semester_start=getattr(args, "semester_start", None),
+        semester_end=getattr(args, "semester_end", None),
+        jobs=getattr(args, "jobs", None),
+        aggregation_jobs=args.aggregation_jobs,
+        search_index=args.search_index
     )
 
 
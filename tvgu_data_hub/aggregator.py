@@ -1,14 +1,16 @@
-from collections import defaultdict
-from typing import Union, Optional
+from collections import Counter, defaultdict
+from dataclasses import replace
+from typing import Union, Optional, Iterable
 
+from .config import CANONICALIZE_SUBJECTS
 from .creator_fk import PK, inherit_instance_dataclass
 from .schedule_parser.tvgu_schedule_parser.consts import SubjectType
-from .schedule_parser.tvgu_schedule_parser.misc import TeacherSmall, Group, AllGroupsSchedules
+from .schedule_parser.tvgu_schedule_parser.misc import TeacherSmall, Group
 from .structs_parser.tvgu_structs_parser.normalizer import TvGUStruct
 from .structs_parser.tvgu_structs_parser.parsers.parser_structs import Department
 from .teachers_parser.tvgu_teachers_parser.misc import Teacher
-from .types import GroupAggregated, StructAggregated, DepartmentAggregated, LessonAggregated, LessonWithID, \
-    SubjectAggregated, PlaceAggregated, TeacherAggregated, TeacherSmallAggregated
+from .types import GroupAggregated, StructAggregated, DepartmentAggregated, LessonAggregated, LessonWithGroups, \
+    LessonWithID, SubjectAggregated, SubjectAliasAggregated, PlaceAggregated, TeacherAggregated, TeacherSmallAggregated
 
 
 def prepare_departments(
@@ -103,7 +105,7 @@ def prepare_structs(structs_pks: dict[tuple, PK], groups_pks: dict[tuple, PK],
     return structs_identified
 
 
-def prepare_groups(schedules: AllGroupsSchedules, groups_pks: dict[tuple, PK],
+def prepare_groups(scheduled_groups: set[tuple[str, Group]], groups_pks: dict[tuple, PK],
                    structs_identified: dict[tuple, StructAggregated]) -> dict[tuple, GroupAggregated]:
     groups_aggregated: list[GroupAggregated] = []
 
@@ -129,7 +131,7 @@ def prepare_groups(schedules: AllGroupsSchedules, groups_pks: dict[tuple, PK],
                 "faculty_code",
                 id=group_pk.id,
                 struct_id=struct.id,
-                has_schedule=schedules.get(struct.code, {}).get(group) is not None
+                has_schedule=(struct.code, group) in scheduled_groups
             )
         )
     groups_identified: dict[tuple, GroupAggregated] = {}
@@ -177,31 +179,54 @@ def prepare_teachers(
     return teachers_identified
 
 
-def prepare_subjects(lessons_with_ids: list[LessonWithID]) -> dict[str, dict[str, SubjectAggregated]]:
-    all_subjects: set[tuple[Optional[str], SubjectType]] = set(
-        (lesson.subject_name, lesson.subject_type) for lesson in lessons_with_ids
+def prepare_subjects(lessons: Iterable[LessonWithGroups]) -> dict[str, dict[str, SubjectAggregated]]:
+    """
+    Тип занятия -> название из расписания -> предмет.
+    При `CANONICALIZE_SUBJECTS` варианты написания одного предмета указывают на общий канонический предмет
+    """
+
+    # Число пар по каждому предмету нужно для выбора канонического варианта
+    subjects_counts: Counter[tuple[Optional[str], SubjectType]] = Counter(
+        (lesson.subject_name, lesson.subject_type) for lesson in lessons
     )
-    subjects_aggregated: list[SubjectAggregated] = []
-
-    for subject_id, subject in enumerate(all_subjects):
-        subjects_aggregated.append(
-            SubjectAggregated(
-                id=subject_id,
-                name=subject[0],
-                type=subject[1]
-            )
+    aliases: dict[tuple[str, SubjectType], tuple[str, SubjectType]] = {}
+
+    if CANONICALIZE_SUBJECTS:
+        from .subject_canonicalizer import canonicalize_subjects
+
+        aliases = canonicalize_subjects(subjects_counts)
+
+    subjects_aggregated: dict[tuple[Optional[str], SubjectType], SubjectAggregated] = {}
+
+    for subject_id, subject in enumerate(subject for subject in subjects_counts if subject not in aliases):
+        subjects_aggregated[subject] = SubjectAggregated(
+            id=subject_id,
+            name=subject[0],
+            type=subject[1]
         )
     subjects_identified: defaultdict[str, dict[str, SubjectAggregated]] = defaultdict(dict)
 
-    for subject in subjects_aggregated:
-        subjects_identified[subject.type][subject.name] = subject
+    for subject in subjects_counts:
+        subjects_identified[subject[1]][subject[0]] = subjects_aggregated[aliases.get(subject, subject)]
 
     return dict(subjects_identified)
 
 
-def prepare_places(lessons_with_ids: list[LessonWithID]) -> dict[str, PlaceAggregated]:
+def prepare_subject_aliases(
+        subjects_identified: dict[str, dict[str, SubjectAggregated]]
+) -> list[SubjectAliasAggregated]:
+    # Названия из расписания, которые были объединены с предметом под другим названием
+    return [
+        SubjectAliasAggregated(name=name, type=subject_type, subject_id=subject.id)
+        for subject_type, subjects in subjects_identified.items()
+        for name, subject in subjects.items()
+        if name != subject.name
+    ]
+
+
+def prepare_places(lessons: Iterable[LessonWithGroups]) -> dict[str, PlaceAggregated]:
     all_places: set[str] = set(
-        group.place for group in lessons_with_ids
+        lesson.place for lesson in lessons
     )
     places_aggregated: list[PlaceAggregated] = []
 
@@ -222,13 +247,15 @@ def prepare_places(lessons_with_ids: list[LessonWithID]) -> dict[str, PlaceAggre
 
 
 def prepare_lessons(
-        lessons: list[LessonWithID],
+        lessons: Iterable[LessonWithID],
         places_identified: dict[str, PlaceAggregated],
         subjects_identified: dict[str, dict[str, SubjectAggregated]],
         teachers_identified: dict[tuple, Union[TeacherAggregated, TeacherSmallAggregated]],
         groups_identified: dict[tuple, GroupAggregated],
 ) -> dict[tuple, LessonAggregated]:
-    lessons_aggregated: list[LessonAggregated] = []
+    # Занятия сразу складываются в итоговый словарь: `lessons` может быть генератором, и промежуточный список
+    # только удвоил бы пиковое потребление памяти
+    lessons_identified: dict[tuple, LessonAggregated] = {}
 
     for lesson in lessons:
         teachers_ids: list[int] = [
@@ -236,24 +263,31 @@ def prepare_lessons(
             for teacher in lesson.teachers
         ]
 
-        lessons_aggregated.append(
-            inherit_instance_dataclass(
-                LessonAggregated,
-                lesson,
-                "groups", "teachers", "subject_name", "subject_type", "place",
-                groups_ids=tuple(
-                    groups_identified[group._identify()].id
-                    for group in lesson.groups
-                ),
-                teachers_ids=tuple(teachers_ids),
-                subject_id=subjects_identified[lesson.subject_type][lesson.subject_name].id,
-                place_id=places_identified[lesson.place].id
-            )
+        lesson_aggregated: LessonAggregated = inherit_instance_dataclass(
+            LessonAggregated,
+            lesson,
+            "groups", "teachers", "subject_name", "subject_type", "place",
+            groups_ids=tuple(
+                groups_identified[group._identify()].id
+                for group in lesson.groups
+            ),
+            teachers_ids=tuple(teachers_ids),
+            subject_id=subjects_identified[lesson.subject_type][lesson.subject_name].id,
+            place_id=places_identified[lesson.place].id
         )
-    lessons_identified: dict[tuple, LessonAggregated] = {}
+        lesson_key: tuple = lesson_aggregated._identify()
+        same_lesson: Optional[LessonAggregated] = lessons_identified.get(lesson_key)
+
+        # Пары с разными написаниями одного предмета в одном слоте и месте нормализация не объединяет, а после
+        # канонизации предмета у них общий ключ - это одна пара, и её группы и преподаватели объединяются
+        if same_lesson is not None:
+            lesson_aggregated = replace(
+                same_lesson,
+                groups_ids=tuple(dict.fromkeys(same_lesson.groups_ids + lesson_aggregated.groups_ids)),
+                teachers_ids=tuple(dict.fromkeys(same_lesson.teachers_ids + lesson_aggregated.teachers_ids))
+            )
 
-    for lesson in lessons_aggregated:
-        lessons_identified[lesson._identify()] = lesson
+        lessons_identified[lesson_key] = lesson_aggregated
 
     return lessons_identified
 
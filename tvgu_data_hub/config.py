@@ -1,3 +1,4 @@
+from datetime import time, timedelta, timezone
 from typing import Final
 
 # Использовать ли эвристики при совпадении инициал преподавателей
@@ -6,3 +7,35 @@ USE_HEURISTICS_FOR_TEACHERS: Final[bool] = True
 
 # Пропускать преподавателей, которых нет в списке преподавателей ТвГУ
 SKIP_UNRECOGNIZED_TEACHERS: Final[bool] = False
+
+# Искать ли преподавателей с опечатками в фамилии, если точного совпадения инициал нет
+USE_TYPO_TOLERANT_TEACHERS_MATCHING: Final[bool] = True
+
+# Максимальное расстояние Левенштейна между фамилиями при поиске с опечатками
+TEACHERS_TYPO_MAX_DISTANCE: Final[int] = 1
+
+# Объединять ли варианты написания одного предмета (пробелы, пунктуация, сокращения) в один предмет
+# Варианты сохраняются в `subject_aliases`
+CANONICALIZE_SUBJECTS: Final[bool] = False
+
+# Время начала и окончания пар по их номерам (расписание звонков ТвГУ)
+LESSONS_TIMES: Final[dict[int, tuple[time, time]]] = {
+    1: (time(8, 30), time(10, 5)),
+    2: (time(10, 15), time(11, 50)),
+    3: (time(12, 10), time(13, 45)),
+    4: (time(14, 0), time(15, 35)),
+    5: (time(15, 45), time(17, 20)),
+    6: (time(17, 30), time(19, 5)),
+    7: (time(19, 15), time(20, 50)),
+}
+
+# Чётности недель (0 - неделя начала семестра), в которые проходит пара, по имени члена `WeekMark` из парсера
+# расписания. Значения отметок (и в `TvGUInfo`, и в JSON-экспорте) сопоставляются с ними через само перечисление
+WEEK_MARKS_PARITIES: Final[dict[str, tuple[int, ...]]] = {
+    "EVERY": (0, 1),
+    "PLUS": (0,),
+    "MINUS": (1,),
+}
+
+# Часовой пояс расписания (Тверь, UTC+3 без перехода на летнее время)
+SCHEDULE_TIMEZONE: Final[timezone] = timezone(timedelta(hours=3), "Europe/Moscow")
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, fields
-from typing import Any, Optional, TypeVar, Type, Callable
+from typing import Any, Optional, TypeVar, Type, Callable, Iterable, Iterator
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -10,7 +10,7 @@ class PK:
 
 # Функция для создания уникальных идентификаторов на основе итогового списка сущностей
 # (должно гарантироваться, что этот список является конечным, то есть, иных сущностей того же рода нигде не встретится)
-def create_entities_pks(entities: list[Any], key_name: Optional[str] = None, skip_none_keys: bool = False,
+def create_entities_pks(entities: Iterable[Any], key_name: Optional[str] = None, skip_none_keys: bool = False,
                         *, custom_key_getter: Optional[Callable[..., tuple]] = None) -> dict[tuple, PK]:
     fks: dict[tuple, PK] = {}
 
@@ -44,6 +44,13 @@ def create_entities_pks(entities: list[Any], key_name: Optional[str] = None, ski
     return fks
 
 
+# Сущности забираются из словаря по одной (в исходном порядке): уже обработанные сразу освобождаются,
+# а не живут до конца обработки вместе с результатом
+def drain_pks(pks: dict[tuple, PK]) -> Iterator[PK]:
+    for key in list(pks):
+        yield pks.pop(key)
+
+
 T = TypeVar("T")
 K = TypeVar("K", bound=dataclass)
 
@@ -1,19 +1,17 @@
+from __future__ import annotations
+
 import asyncio
-from dataclasses import dataclass
-from typing import Union
-
-from .aggregator import prepare_lessons, prepare_places, prepare_subjects, prepare_teachers, \
-    prepare_groups, prepare_structs, prepare_departments
-from .creator_fk import PK, create_entities_pks, inherit_instance_dataclass
-from .normalizer import lessons_normalize, normalize_teachers_for_lessons
-from .schedule_parser.tvgu_schedule_parser import get_all_tvgu_schedules
-from .schedule_parser.tvgu_schedule_parser.misc import AllGroupsSchedules
-from .structs_parser.tvgu_structs_parser import get_all_tvgu_structs
-from .structs_parser.tvgu_structs_parser.normalizer import TvGUStruct
-from .teachers_parser.tvgu_teachers_parser import get_all_tvgu_teachers
-from .teachers_parser.tvgu_teachers_parser.misc import Teacher
-from .types import GroupAggregated, DepartmentAggregated, LessonAggregated, LessonWithGroups, LessonWithID, \
-    SubjectAggregated, PlaceAggregated, TeacherAggregated, TeacherSmallAggregated, StructAggregated
+from dataclasses import dataclass, field
+from typing import Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .creator_fk import PK
+    from .schedule_parser.tvgu_schedule_parser.misc import AllGroupsSchedules, Group
+    from .structs_parser.tvgu_structs_parser.normalizer import TvGUStruct
+    from .teacher_typo_index import TeacherTypoMatch
+    from .teachers_parser.tvgu_teachers_parser.misc import Teacher
+    from .types import GroupAggregated, DepartmentAggregated, LessonAggregated, SubjectAggregated, \
+        SubjectAliasAggregated, PlaceAggregated, TeacherAggregated, TeacherSmallAggregated, StructAggregated
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -23,11 +21,30 @@ class TvGUInfo:
     teachers: list[TeacherAggregated | TeacherSmallAggregated]
     places: list[PlaceAggregated]
     subjects: list[SubjectAggregated]
+    # Заполняется только при `CANONICALIZE_SUBJECTS`; в старых снимках отсутствует
+    subject_aliases: list[SubjectAliasAggregated] = field(default_factory=list)
     groups: list[GroupAggregated]
     lessons: list[LessonAggregated]
 
 
-async def get_all_tvgu_data() -> TvGUInfo:
+async def get_all_tvgu_data(workers: Optional[int] = None,
+                            teachers_typo_report: Optional[dict[str, TeacherTypoMatch]] = None) -> TvGUInfo:
+    """
+    `workers` - количество процессов для пофакультетной нормализации пар (`None` - в текущем процессе).
+    В `teachers_typo_report` записываются преподаватели, сопоставленные с учётом опечаток в инициалах
+    """
+
+    # Парсеры (вместе с их HTTP-стеком) и агрегация импортируются только при реальном сборе данных,
+    # чтобы `--help` и работа со снимками не тянули их за собой
+    from .aggregator import prepare_lessons, prepare_places, prepare_subjects, prepare_subject_aliases, \
+        prepare_teachers, prepare_groups, prepare_structs, prepare_departments
+    from .creator_fk import create_entities_pks, drain_pks, inherit_instance_dataclass
+    from .normalizer import lessons_normalize, normalize_teachers_for_lessons
+    from .schedule_parser.tvgu_schedule_parser import get_all_tvgu_schedules
+    from .structs_parser.tvgu_structs_parser import get_all_tvgu_structs
+    from .teachers_parser.tvgu_teachers_parser import get_all_tvgu_teachers
+    from .types import LessonWithID
+
     structs: list[TvGUStruct]
     teachers: list[Teacher]
     schedules: AllGroupsSchedules
@@ -43,17 +60,28 @@ async def get_all_tvgu_data() -> TvGUInfo:
         [group for groups in schedules.values() for group in groups],
         custom_key_getter=lambda group: group._identify()
     )
+    # От сырых расписаний для групп нужен только факт наличия расписания
+    scheduled_groups: set[tuple[str, Group]] = {
+        (faculty_code, group)
+        for faculty_code, groups_schedule in schedules.items()
+        for group, lessons in groups_schedule.items() if lessons is not None
+    }
 
-    normalized_lessons: list[LessonWithGroups] = lessons_normalize(schedules)
-    lessons_pks: dict[tuple, PK] = create_entities_pks(
-        normalized_lessons, custom_key_getter=lambda lesson: lesson._identify()
-    )
-    lessons_pks = normalize_teachers_for_lessons(lessons_pks, teachers)
+    if workers is None:
+        # Нормализация - генератор, поэтому промежуточного списка пар не возникает
+        lessons_pks: dict[tuple, PK] = create_entities_pks(
+            lessons_normalize(schedules), custom_key_getter=lambda lesson: lesson._identify()
+        )
+        lessons_pks = normalize_teachers_for_lessons(lessons_pks, teachers, teachers_typo_report)
+    else:
+        from .sharding import prepare_lessons_sharded
 
-    lessons_with_ids: list[LessonWithID] = [
-        inherit_instance_dataclass(LessonWithID, lesson_pk.entity, id=lesson_pk.id)
-        for lesson_pk in lessons_pks.values()
-    ]
+        lessons_pks: dict[tuple, PK] = prepare_lessons_sharded(
+            schedules, teachers, workers, teachers_typo_report
+        )
+
+    # Сырые расписания больше не нужны, а их занятия - самая объёмная часть входных данных
+    del schedules
 
     teachers_identified: dict[tuple, Union[TeacherAggregated, TeacherSmallAggregated]] = prepare_teachers(lessons_pks,
                                                                                                           teachers)
@@ -62,23 +90,41 @@ async def get_all_tvgu_data() -> TvGUInfo:
     structs_identified: dict[tuple, StructAggregated] = prepare_structs(
         structs_pks, groups_pks, teachers_identified, departments_identified
     )
-    places_identified: dict[str, PlaceAggregated] = prepare_places(lessons_with_ids)
-    subjects_identified: dict[str, dict[str, SubjectAggregated]] = prepare_subjects(lessons_with_ids)
-    groups_identified: dict[tuple, GroupAggregated] = prepare_groups(schedules, groups_pks, structs_identified)
+    places_identified: dict[str, PlaceAggregated] = prepare_places(
+        lesson_pk.entity for lesson_pk in lessons_pks.values()
+    )
+    subjects_identified: dict[str, dict[str, SubjectAggregated]] = prepare_subjects(
+        lesson_pk.entity for lesson_pk in lessons_pks.values()
+    )
+    groups_identified: dict[tuple, GroupAggregated] = prepare_groups(scheduled_groups, groups_pks, structs_identified)
+
+    # Пары с идентификаторами создаются по одной прямо во время агрегации, а исходные пары освобождаются
+    # по мере обработки
     lessons_aggregated: dict[tuple, LessonAggregated] = prepare_lessons(
-        lessons_with_ids,
+        (
+            inherit_instance_dataclass(LessonWithID, lesson_pk.entity, id=lesson_pk.id)
+            for lesson_pk in drain_pks(lessons_pks)
+        ),
         places_identified,
         subjects_identified,
         teachers_identified,
         groups_identified
     )
+    del lessons_pks
+
+    lessons: list[LessonAggregated] = list(lessons_aggregated.values())
+    del lessons_aggregated
 
     return TvGUInfo(
         departments=list(departments_identified.values()),
         structs=list(structs_identified.values()),
         teachers=list(teachers_identified.values()),
         places=list(places_identified.values()),
-        subjects=[subject for subjects in subjects_identified.values() for subject in subjects.values()],
+        # Варианты написания одного предмета указывают на общий объект, поэтому предметы берутся без повторов
+        subjects=list({
+            subject.id: subject for subjects in subjects_identified.values() for subject in subjects.values()
+        }.values()),
+        subject_aliases=prepare_subject_aliases(subjects_identified),
         groups=list(groups_identified.values()),
-        lessons=list(lessons_aggregated.values())
+        lessons=lessons
     )
@@ -0,0 +1,213 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, time, timezone
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .misc import make_entity_file_name, make_file_name, write_if_changed, load_manifest, save_manifest, text_hash
+from .semester import Semester, iter_lesson_dates
+from .snapshot import SnapshotDict, snapshot_as_dict, teacher_display_name
+from .snapshot_diff import Key, collection_keys
+
+# Календари формируются из снимка (`TvGUInfo` или JSON-экспорта): по одному на группу и на преподавателя.
+# Пересчитываются только календари, у которых изменились исходные данные, а записываются - только изменившиеся
+
+ICS_LINE_LIMIT = 75
+
+Event = dict[str, Any]
+
+
+@dataclass(frozen=True, kw_only=True)
+class CalendarJob:
+    path: Path
+    name: str
+    events: list[Event]
+    semester: Semester
+    known_hash: Optional[str]
+
+
+@dataclass(frozen=True, kw_only=True)
+class IcsExportResult:
+    written: list[str]
+    unchanged: list[str]
+    # Календари, исходные данные которых не изменились, и поэтому они не пересчитывались
+    skipped: list[str]
+    removed: list[str]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    # Строки iCalendar ограничены 75 октетами, продолжение начинается с пробела
+    if len(line.encode("UTF-8")) <= ICS_LINE_LIMIT:
+        return line
+
+    parts: list[str] = []
+    current: str = ""
+    current_size: int = 0
+
+    for char in line:
+        char_size: int = len(char.encode("UTF-8"))
+
+        if current_size + char_size > ICS_LINE_LIMIT:
+            parts.append(current)
+            current = ""
+            current_size = 1
+
+        current += char
+        current_size += char_size
+
+    parts.append(current)
+
+    return "\r\n ".join(parts)
+
+
+def _format_utc(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_calendar(name: str, events: list[Event], semester: Semester) -> str:
+    # Метка создания привязана к семестру, а не к текущему времени, иначе содержимое менялось бы при каждом запуске
+    dtstamp: str = _format_utc(datetime.combine(semester.start, time(), tzinfo=timezone.utc))
+
+    lines: list[str] = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//TvGU DataHub//RU",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+
+    occurrences: list[tuple[datetime, datetime, Event]] = [
+        (*semester.lesson_bounds(day, event["lesson_number"]), event)
+        for event in events
+        for day in iter_lesson_dates(event["week_mark"], event["week_day"], semester)
+    ]
+    occurrences.sort(key=lambda occurrence: (occurrence[0], occurrence[2]["uid"]))
+
+    for start, end, event in occurrences:
+        lines.extend((
+            "BEGIN:VEVENT",
+            f"UID:{event['uid']}-{start:%Y%m%d}@tvgu-data-hub",
+            f"DTSTAMP:{dtstamp}",
+            f"DTSTART:{_format_utc(start)}",
+            f"DTEND:{_format_utc(end)}",
+            f"SUMMARY:{_escape(event['summary'])}",
+            f"LOCATION:{_escape(event['location'])}",
+            f"DESCRIPTION:{_escape(event['description'])}",
+            "END:VEVENT",
+        ))
+
+    lines.append("END:VCALENDAR")
+
+    return "".join(f"{_fold(line)}\r\n" for line in lines)
+
+
+def _render_calendar_job(job: CalendarJob) -> tuple[str, bool]:
+    return write_if_changed(job.path, render_calendar(job.name, job.events, job.semester), job.known_hash)
+
+
+def _collect_calendars(snapshot: SnapshotDict) -> dict[str, tuple[str, list[Event]]]:
+    subjects: dict[int, dict[str, Any]] = {subject["id"]: subject for subject in snapshot["subjects"]}
+    places: dict[int, dict[str, Any]] = {place["id"]: place for place in snapshot["places"]}
+    groups: dict[int, dict[str, Any]] = {group["id"]: group for group in snapshot["groups"]}
+    teachers: dict[int, dict[str, Any]] = {teacher["id"]: teacher for teacher in snapshot["teachers"]}
+    teachers_keys: dict[int, Key] = collection_keys(snapshot, "teachers")
+
+    # Относительный путь -> (название календаря, события)
+    calendars: dict[str, tuple[str, list[Event]]] = {}
+
+    for lesson in snapshot["lessons"]:
+        subject: dict[str, Any] = subjects[lesson["subject_id"]]
+        place_name: str = places[lesson["place_id"]]["name"]
+        lesson_groups: list[str] = sorted(groups[group_id]["origin_name"] for group_id in lesson["groups_ids"])
+        lesson_teachers: list[str] = [
+            teacher_display_name(teachers[teacher_id]) for teacher_id in lesson["teachers_ids"]
+        ]
+
+        event: Event = {
+            # Идентификаторы нестабильны между запусками, поэтому UID строится по содержательному ключу пары
+            "uid": text_hash(json.dumps(
+                [lesson["week_mark"], lesson["week_day"], lesson["lesson_number"], subject["name"], subject["type"],
+                 place_name],
+                ensure_ascii=False
+            ))[:16],
+            "week_mark": lesson["week_mark"],
+            "week_day": lesson["week_day"],
+            "lesson_number": lesson["lesson_number"],
+            "summary": f"{subject['name']} ({subject['type']})" if subject["type"] else subject["name"],
+            "location": place_name,
+            "description": f"Преподаватели: {', '.join(lesson_teachers) or '-'}\nГруппы: {', '.join(lesson_groups)}",
+        }
+
+        for group_id in lesson["groups_ids"]:
+            group_name: str = groups[group_id]["origin_name"]
+            calendars.setdefault(f"groups/{make_file_name(group_name)}.ics", (group_name, []))[1].append(event)
+
+        for teacher_id in lesson["teachers_ids"]:
+            teacher_name: str = teacher_display_name(teachers[teacher_id])
+            calendars.setdefault(
+                f"teachers/{make_entity_file_name(teacher_name, teachers_keys[teacher_id])}.ics", (teacher_name, [])
+            )[1].append(event)
+
+    for _, events in calendars.values():
+        events.sort(key=lambda event: event["uid"])
+
+    return calendars
+
+
+def export_ics(data: Any, directory: Union[str, Path], semester: Semester,
+               max_workers: Optional[int] = None) -> IcsExportResult:
+    snapshot: SnapshotDict = snapshot_as_dict(data)
+    directory: Path = Path(directory)
+    manifest: dict[str, dict[str, str]] = load_manifest(directory)
+
+    new_manifest: dict[str, dict[str, str]] = {}
+    jobs: list[tuple[str, str, CalendarJob]] = []
+    skipped: list[str] = []
+
+    for relative_path, (name, events) in _collect_calendars(snapshot).items():
+        source_hash: str = text_hash(json.dumps([name, events, repr(semester)], ensure_ascii=False))
+        entry: Optional[dict[str, str]] = manifest.get(relative_path)
+
+        if entry is not None and entry.get("source") == source_hash and (directory / relative_path).exists():
+            new_manifest[relative_path] = entry
+            skipped.append(relative_path)
+            continue
+
+        jobs.append((
+            relative_path,
+            source_hash,
+            CalendarJob(
+                path=directory / relative_path,
+                name=name,
+                events=events,
+                semester=semester,
+                known_hash=None if entry is None else entry.get("content")
+            )
+        ))
+
+    written: list[str] = []
+    unchanged: list[str] = []
+
+    if jobs:
+        workers: int = max_workers or os.cpu_count() or 1
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _render_calendar_job, (job for _, _, job in jobs), chunksize=max(1, len(jobs) // (workers * 4))
+            )
+
+            for (relative_path, source_hash, _), (content_hash, is_written) in zip(jobs, results):
+                new_manifest[relative_path] = {"source": source_hash, "content": content_hash}
+                (written if is_written else unchanged).append(relative_path)
+
+    removed: list[str] = [relative_path for relative_path in manifest if relative_path not in new_manifest]
+    save_manifest(directory, new_manifest, removed)
+
+    return IcsExportResult(written=written, unchanged=unchanged, skipped=skipped, removed=removed)
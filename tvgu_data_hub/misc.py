@@ -1,6 +1,10 @@
+import hashlib
 import json
+import os
+import re
 from collections import defaultdict
-from typing import Optional, Callable
+from pathlib import Path
+from typing import Optional, Callable, Iterable
 
 
 def list_to_dict_by_key(list_: list, key_name: str, skip_none_keys: bool = False, could_be_collisions: bool = False,
@@ -29,3 +33,72 @@ def list_to_dict_by_key(list_: list, key_name: str, skip_none_keys: bool = False
 class CustomEncoder(json.JSONEncoder):
     def default(self, obj):
         return obj.__dict__
+
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("UTF-8"), digest_size=16).hexdigest()
+
+
+def make_file_name(name: str, max_length: int = 100) -> str:
+    # Имя файла должно быть безопасным и при этом стабильным между запусками (в отличие от идентификаторов),
+    # а чтобы разные имена не склеились после замены символов, к изменённым добавляется хэш исходного имени
+    safe_name: str = re.sub(r"[^\w.-]+", "_", name).strip("._")[:max_length]
+
+    if safe_name != name:
+        safe_name = f"{safe_name}-{text_hash(name)[:8]}"
+
+    return safe_name
+
+
+def make_entity_file_name(name: str, key: tuple) -> str:
+    # Отображаемые имена сущностей могут совпадать (одноимённые преподаватели), поэтому имя файла дополняется
+    # хэшем естественного ключа - иначе разные сущности писали бы в один файл
+    return f"{make_file_name(name)}-{text_hash(json.dumps(key, ensure_ascii=False))[:8]}"
+
+
+def write_if_changed(path: Path, content: str, known_hash: Optional[str] = None) -> tuple[str, bool]:
+    """
+    Запись файла, только если его содержимое изменилось.
+    `known_hash` - хэш содержимого файла на диске (например, из манифеста), чтобы не перечитывать файл
+    """
+
+    content_hash: str = text_hash(content)
+
+    if path.exists():
+        if known_hash is None:
+            known_hash = text_hash(path.read_bytes().decode("UTF-8"))
+
+        if known_hash == content_hash:
+            return content_hash, False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Через временный файл, чтобы читатели (rsync, CDN) не увидели недописанный файл
+    tmp_path: Path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(content, encoding="UTF-8", newline="")
+    os.replace(tmp_path, path)
+
+    return content_hash, True
+
+
+def load_manifest(directory: Path) -> dict[str, dict[str, str]]:
+    manifest_path: Path = directory / MANIFEST_FILE_NAME
+
+    if not manifest_path.exists():
+        return {}
+
+    return json.loads(manifest_path.read_text(encoding="UTF-8")).get("files", {})
+
+
+def save_manifest(directory: Path, files: dict[str, dict[str, str]], removed: Iterable[str] = ()) -> None:
+    # Файлы, пропавшие из манифеста, удаляются, чтобы в директории не оставалось устаревших данных
+    for relative_path in removed:
+        (directory / relative_path).unlink(missing_ok=True)
+
+    write_if_changed(
+        directory / MANIFEST_FILE_NAME,
+        json.dumps({"files": dict(sorted(files.items()))}, ensure_ascii=False, indent=2)
+    )
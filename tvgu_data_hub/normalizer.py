@@ -1,43 +1,36 @@
 from collections import defaultdict
 from dataclasses import fields, replace
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
-from .config import USE_HEURISTICS_FOR_TEACHERS, SKIP_UNRECOGNIZED_TEACHERS
+from .config import USE_HEURISTICS_FOR_TEACHERS, SKIP_UNRECOGNIZED_TEACHERS, USE_TYPO_TOLERANT_TEACHERS_MATCHING, \
+    TEACHERS_TYPO_MAX_DISTANCE
 from .creator_fk import PK
 from .misc import list_to_dict_by_key
-from .schedule_parser.tvgu_schedule_parser.misc import AllGroupsSchedules, TeacherSmall
-from .teacher_heuristics import resolve_teacher_small_in_lesson
+from .schedule_parser.tvgu_schedule_parser.misc import AllGroupsSchedules, Group, Lesson, TeacherSmall
+from .teacher_typo_index import LazyTeachersTypoIndex, TeacherTypoMatch
 from .teachers_parser.tvgu_teachers_parser.misc import Teacher
 from .types import LessonWithGroups
 
 
-def lessons_normalize(schedules: AllGroupsSchedules) -> list[LessonWithGroups]:
-    lessons_flat: list[LessonWithGroups] = [
-        # Сорян за такой comprehension)
-        LessonWithGroups(
-            **dict((field.name, getattr(lesson, field.name)) for field in fields(lesson) if field.name != "week_day"),
-            groups=(group,),
-            # 0 - Понедельник (сдвигаем, потому что у API ТвГУ понедельник - это 1)
-            week_day=lesson.week_day - 1
-        )
-        for groups_schedule in schedules.values()
-        for group, lessons in groups_schedule.items() if lessons
-        for lesson in lessons
-    ]
-
+def lessons_normalize(schedules: AllGroupsSchedules) -> Iterator[LessonWithGroups]:
     # Объединяем пары, которые на самом деле являются одной парой
     # Метод `.identify()` намеренно не учитывает состав преподавателей и групп
-    normalized_lessons: list[LessonWithGroups] = []
-    grouped: defaultdict[tuple, list[LessonWithGroups]] = defaultdict(list)
-
-    for lesson in lessons_flat:
-        grouped[lesson._identify()].append(lesson)
-
-    for lessons_group in grouped.values():
-        base_lesson: LessonWithGroups = lessons_group[0]
+    # Группируются сами пары из расписаний (они и так хранятся в `schedules`), а `LessonWithGroups` создаётся
+    # только одна на каждую итоговую пару - а не по копии на каждую группу
+    grouped: defaultdict[tuple, list[tuple[Lesson, Group]]] = defaultdict(list)
+
+    for groups_schedule in schedules.values():
+        for group, lessons in groups_schedule.items():
+            for lesson in lessons or ():
+                grouped[lesson._identify()].append((lesson, group))
+
+    # Группы пар забираются из словаря по мере обработки, чтобы не держать в памяти и их, и итоговые пары
+    for lesson_key in list(grouped):
+        lessons_group: list[tuple[Lesson, Group]] = grouped.pop(lesson_key)
+        base_lesson: Lesson = lessons_group[0][0]
         grouped_teachers: defaultdict[str, list[TeacherSmall]] = defaultdict(list)
 
-        for lesson in lessons_group:
+        for lesson, _ in lessons_group:
             for teacher in lesson.teachers:
                 grouped_teachers[teacher.initials].append(teacher)
 
@@ -46,46 +39,95 @@ def lessons_normalize(schedules: AllGroupsSchedules) -> list[LessonWithGroups]:
         # одинаковыми инициалами крайне мала
         normalized_teachers: tuple[TeacherSmall, ...] = tuple(teachers[0] for teachers in grouped_teachers.values())
 
-        normalized_lessons.append(
-            replace(
-                base_lesson,
-                teachers=normalized_teachers,
-                groups=tuple({group for lesson in lessons_group for group in lesson.groups}),
-            )
+        yield LessonWithGroups(
+            # Сорян за такой comprehension)
+            **dict(
+                (field.name, getattr(base_lesson, field.name))
+                for field in fields(base_lesson) if field.name not in ("week_day", "teachers")
+            ),
+            teachers=normalized_teachers,
+            groups=tuple({group for _, group in lessons_group}),
+            # 0 - Понедельник (сдвигаем, потому что у API ТвГУ понедельник - это 1)
+            week_day=base_lesson.week_day - 1
         )
 
-    return normalized_lessons
 
+def get_teachers_by_initials(teachers: list[Teacher]) -> dict[str, list[Teacher]]:
+    return list_to_dict_by_key(teachers, "initials", False, True, handle_key_func=lambda x: x.lower())
+
+
+def get_teachers_typo_index(teachers_by_initials: dict[str, list[Teacher]]) -> Optional[LazyTeachersTypoIndex]:
+    if not USE_TYPO_TOLERANT_TEACHERS_MATCHING:
+        return None
+    # Сам индекс (и rapidfuzz) понадобится только при первом промахе точного поиска
+    return LazyTeachersTypoIndex(initials_keys=list(teachers_by_initials), max_distance=TEACHERS_TYPO_MAX_DISTANCE)
+
+
+def resolve_lesson_teacher(lesson: LessonWithGroups, teacher_small: TeacherSmall,
+                           teachers_by_initials: dict[str, list[Teacher]],
+                           typo_index: Optional[LazyTeachersTypoIndex] = None,
+                           typo_report: Optional[dict[str, TeacherTypoMatch]] = None
+                           ) -> Optional[Union[TeacherSmall, Teacher]]:
+    """
+    Преподаватель из списка ТвГУ для преподавателя из расписания (`None` - если преподавателя нужно пропустить).
+    Сопоставления, найденные с учётом опечаток, записываются в `typo_report` (по инициалам из расписания)
+    """
+
+    suitable_teachers: Optional[list[Teacher]] = teachers_by_initials.get(teacher_small.initials.lower())
+
+    if not suitable_teachers and typo_index is not None:
+        typo_match: Optional[tuple[list[str], int]] = typo_index.lookup(teacher_small.initials)
+
+        if typo_match is not None:
+            matched_keys, distance = typo_match
+            suitable_teachers = [teacher for key in matched_keys for teacher in teachers_by_initials[key]]
+
+            if typo_report is not None:
+                typo_report[teacher_small.initials] = TeacherTypoMatch(
+                    source=teacher_small.initials,
+                    matched=tuple(dict.fromkeys(teacher.initials for teacher in suitable_teachers)),
+                    distance=distance
+                )
+
+    if suitable_teachers is None or len(suitable_teachers) == 0:
+        if SKIP_UNRECOGNIZED_TEACHERS:
+            return None
+
+        return teacher_small
+    elif len(suitable_teachers) == 1:
+        return suitable_teachers[0]
+
+    if not USE_HEURISTICS_FOR_TEACHERS:
+        return teacher_small
+
+    # Эвристики (и rapidfuzz) нужны только при неоднозначных инициалах, поэтому импортируются здесь
+    from .teacher_heuristics import resolve_teacher_small_in_lesson
+
+    # Эвристическая оценка на основе информации пары
+    possible_teachers: list[tuple[Teacher, float]] = resolve_teacher_small_in_lesson(
+        lesson, suitable_teachers
+    )
+
+    return max(possible_teachers, key=lambda x: x[1])[0]
+
+
+def normalize_teachers_for_lessons(lesson_pks: dict[tuple, PK], teachers: list[Teacher],
+                                   typo_report: Optional[dict[str, TeacherTypoMatch]] = None) -> dict[tuple, PK]:
+    teachers_by_initials: dict[str, list[Teacher]] = get_teachers_by_initials(teachers)
+    # Индекс строится один раз и только если встретятся инициалы без точного совпадения
+    typo_index: Optional[LazyTeachersTypoIndex] = get_teachers_typo_index(teachers_by_initials)
 
-def normalize_teachers_for_lessons(lesson_pks: dict[tuple, PK], teachers: list[Teacher]) -> dict[tuple, PK]:
-    teachers_by_initials: dict[str, list[Teacher]] = list_to_dict_by_key(teachers, "initials", False, True,
-                                                                         handle_key_func=lambda x: x.lower())
     for lesson_key, lesson_pk in lesson_pks.items():
         lesson: LessonWithGroups = lesson_pk.entity
         cur_teachers: list[Union[TeacherSmall, Teacher]] = []
 
         for teacher_small in lesson.teachers:
-            suitable_teachers: Optional[list[Teacher]] = teachers_by_initials.get(teacher_small.initials.lower())
-
-            if suitable_teachers is None or len(suitable_teachers) == 0:
-                if SKIP_UNRECOGNIZED_TEACHERS:
-                    continue
-
-                cur_teachers.append(teacher_small)
-            elif len(suitable_teachers) == 1:
-                cur_teachers.append(suitable_teachers[0])
-            else:
-                if not USE_HEURISTICS_FOR_TEACHERS:
-                    cur_teachers.append(teacher_small)
-                    continue
-
-                # Эвристическая оценка на основе информации пары
-                possible_teachers: list[tuple[Teacher, float]] = resolve_teacher_small_in_lesson(
-                    lesson, suitable_teachers
-                )
+            teacher: Optional[Union[TeacherSmall, Teacher]] = resolve_lesson_teacher(
+                lesson, teacher_small, teachers_by_initials, typo_index, typo_report
+            )
 
-                best_teacher_match: Teacher = max(possible_teachers, key=lambda x: x[1])[0]
-                cur_teachers.append(best_teacher_match)
+            if teacher is not None:
+                cur_teachers.append(teacher)
 
         lesson: LessonWithGroups = replace(lesson, teachers=tuple(cur_teachers))
         lesson_pks[lesson_key] = replace(lesson_pk, entity=lesson)
@@ -0,0 +1,193 @@
+import heapq
+import json
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from .snapshot import SnapshotDict, snapshot_as_dict, teacher_display_name
+
+# Индекс для автодополнения: инвертированный индекс по триграммам слов выбирает небольшое число кандидатов,
+# и только они переранжируются нечётким сравнением rapidfuzz
+
+SEARCH_INDEX_VERSION = 1
+NGRAM_SIZE = 3
+# Сколько кандидатов с наибольшим числом общих триграмм переранжируется
+CANDIDATES_LIMIT = 64
+# Минимальная доля триграмм запроса, которая должна встретиться у кандидата
+MIN_NGRAMS_SHARE = 0.3
+# Во сколько раз список документов триграммы должен превышать число кандидатов, чтобы не перебираться целиком
+POSTING_SCAN_RATIO = 8
+
+
+def normalize_search_text(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    return " ".join(re.findall(r"\w+", text.lower().replace("ё", "е")))
+
+
+def text_ngrams(normalized_text: str) -> set[str]:
+    # Слова дополняются пробелами слева, чтобы начало слова давало собственные триграммы - так работает
+    # поиск по префиксу, пока пользователь ещё печатает
+    ngrams: set[str] = set()
+
+    for word in normalized_text.split():
+        padded: str = " " * (NGRAM_SIZE - 1) + word + " "
+        ngrams.update(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+    return ngrams
+
+
+@dataclass(frozen=True, kw_only=True)
+class SearchDocument:
+    kind: str
+    id: int
+    name: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class SearchIndex:
+    documents: list[SearchDocument]
+    # Нормализованный текст каждого документа (по нему идёт переранжирование)
+    texts: list[str]
+    # Триграмма -> возрастающий список номеров документов
+    postings: dict[str, list[int]]
+
+    def search(self, query: str, limit: int = 10,
+               kinds: Optional[Iterable[str]] = None) -> list[tuple[SearchDocument, float]]:
+        normalized_query: str = normalize_search_text(query)
+        query_ngrams: set[str] = text_ngrams(normalized_query)
+
+        if not query_ngrams:
+            return []
+
+        allowed_kinds: Optional[set[str]] = None if kinds is None else set(kinds)
+        min_hits: int = max(1, int(len(query_ngrams) * MIN_NGRAMS_SHARE))
+        hits: dict[int, int] = {}
+
+        # Сначала редкие триграммы: они дают немного кандидатов, а длинные списки частых триграмм (вроде начала
+        # популярной фамилии) затем не перебираются целиком, а лишь проверяются для уже найденных кандидатов.
+        # Пропускать новые документы можно, только если они заведомо не попадут в кандидаты: документ, которого ещё
+        # нет среди найденных, наберёт не больше оставшихся триграмм. Иначе запрос с опечаткой, чья редкая
+        # триграмма совпала с посторонним документом, терял бы все верные совпадения
+        ordered_ngrams: list[str] = sorted(query_ngrams, key=lambda x: len(self.postings.get(x, ())))
+
+        for position, ngram in enumerate(ordered_ngrams):
+            posting: list[int] = self.postings.get(ngram, [])
+            remaining_ngrams: int = len(ordered_ngrams) - position
+
+            if (
+                hits and len(posting) > len(hits) * POSTING_SCAN_RATIO
+                and remaining_ngrams < self._new_candidate_threshold(hits, min_hits, allowed_kinds)
+            ):
+                for document_id in hits:
+                    position_in_posting: int = bisect_left(posting, document_id)
+
+                    if position_in_posting < len(posting) and posting[position_in_posting] == document_id:
+                        hits[document_id] += 1
+                continue
+
+            for document_id in posting:
+                hits[document_id] = hits.get(document_id, 0) + 1
+
+        candidates: list[int] = heapq.nlargest(
+            CANDIDATES_LIMIT,
+            (
+                document_id for document_id, document_hits in hits.items()
+                if document_hits >= min_hits and self._is_allowed(document_id, allowed_kinds)
+            ),
+            key=hits.__getitem__
+        )
+
+        # rapidfuzz нужен только при реальном поиске
+        from rapidfuzz import fuzz
+
+        scored: list[tuple[SearchDocument, float]] = [
+            (self.documents[document_id], fuzz.WRatio(normalized_query, self.texts[document_id]))
+            for document_id in candidates
+        ]
+        scored.sort(key=lambda x: x[1], reverse=True)
+
+        return scored[:limit]
+
+    def _is_allowed(self, document_id: int, allowed_kinds: Optional[set[str]]) -> bool:
+        return allowed_kinds is None or self.documents[document_id].kind in allowed_kinds
+
+    def _new_candidate_threshold(self, hits: dict[int, int], min_hits: int,
+                                 allowed_kinds: Optional[set[str]]) -> int:
+        """Сколько триграмм должен набрать новый документ, чтобы попасть в кандидаты"""
+
+        allowed_hits: list[int] = [
+            document_hits for document_id, document_hits in hits.items() if self._is_allowed(document_id, allowed_kinds)
+        ]
+
+        if len(allowed_hits) < CANDIDATES_LIMIT:
+            return min_hits
+
+        # Вытеснить можно только худшего из текущих кандидатов (число совпадений у них со временем лишь растёт)
+        return max(min_hits, heapq.nlargest(CANDIDATES_LIMIT, allowed_hits)[-1])
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": SEARCH_INDEX_VERSION,
+            "documents": [[document.kind, document.id, document.name] for document in self.documents],
+            "texts": self.texts,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SearchIndex":
+        if data.get("version") != SEARCH_INDEX_VERSION:
+            raise ValueError(f"Неподдерживаемая версия поискового индекса: {data.get('version')}")
+
+        return cls(
+            documents=[SearchDocument(kind=kind, id=id_, name=name) for kind, id_, name in data["documents"]],
+            texts=data["texts"],
+            postings=data["postings"]
+        )
+
+    def dump(self, path: Union[str, Path]) -> None:
+        with open(path, "w+", encoding="UTF-8") as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SearchIndex":
+        with open(path, encoding="UTF-8") as file:
+            return cls.from_dict(json.load(file))
+
+
+def _iter_search_entries(snapshot: SnapshotDict) -> Iterable[tuple[str, int, str, str]]:
+    """(вид, идентификатор, отображаемое имя, текст для индекса)"""
+
+    for teacher in snapshot["teachers"]:
+        name: str = teacher_display_name(teacher)
+        # По полному ФИО ищут и по инициалам
+        yield "teacher", teacher["id"], name, f"{name} {teacher['initials']}" if teacher.get("surname") else name
+
+    for subject in snapshot["subjects"]:
+        if subject["name"]:
+            yield "subject", subject["id"], subject["name"], subject["name"]
+
+    for group in snapshot["groups"]:
+        yield "group", group["id"], group["origin_name"], group["origin_name"]
+
+    for place in snapshot["places"]:
+        yield "place", place["id"], place["name"], place["name"]
+
+
+def build_search_index(data: Any) -> SearchIndex:
+    documents: list[SearchDocument] = []
+    texts: list[str] = []
+    postings: dict[str, list[int]] = {}
+
+    for document_id, (kind, entity_id, name, text) in enumerate(_iter_search_entries(snapshot_as_dict(data))):
+        normalized_text: str = normalize_search_text(text)
+
+        documents.append(SearchDocument(kind=kind, id=entity_id, name=name))
+        texts.append(normalized_text)
+
+        for ngram in text_ngrams(normalized_text):
+            postings.setdefault(ngram, []).append(document_id)
+
+    return SearchIndex(documents=documents, texts=texts, postings=postings)
@@ -0,0 +1,84 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from functools import cache
+from typing import Any, Iterator, Optional
+
+from .config import LESSONS_TIMES, WEEK_MARKS_PARITIES, SCHEDULE_TIMEZONE
+
+
+@dataclass(frozen=True, kw_only=True)
+class Semester:
+    start: date
+    end: date
+    lessons_times: dict[int, tuple[time, time]] = field(default_factory=lambda: dict(LESSONS_TIMES))
+    tz: timezone = SCHEDULE_TIMEZONE
+
+    def __post_init__(self) -> None:
+        if self.start > self.end:
+            raise ValueError(f"Начало семестра ({self.start}) позже его окончания ({self.end})")
+
+    @property
+    def first_monday(self) -> date:
+        return self.start - timedelta(days=self.start.weekday())
+
+    def week_parity(self, day: date) -> int:
+        # Неделя, на которую приходится начало семестра, считается нулевой (чётной)
+        return (day - self.first_monday).days // 7 % 2
+
+    def lesson_bounds(self, day: date, lesson_number: int) -> tuple[datetime, datetime]:
+        lesson_times: Optional[tuple[time, time]] = self.lessons_times.get(lesson_number)
+
+        if lesson_times is None:
+            raise KeyError(f"Не задано время для пары №{lesson_number}")
+
+        start_time, end_time = lesson_times
+
+        return (
+            datetime.combine(day, start_time, tzinfo=self.tz),
+            datetime.combine(day, end_time, tzinfo=self.tz)
+        )
+
+
+@cache
+def _week_marks_parities() -> dict[Any, tuple[int, ...]]:
+    # Парсер расписания импортируется только при первом обращении: модуль используется и при работе со снимками
+    from .schedule_parser.tvgu_schedule_parser.consts import WeekMark
+
+    # Расхождение настроек с перечислением - ошибка конфигурации, а не повод молча пропускать пары
+    unknown: set[str] = set(WEEK_MARKS_PARITIES) - set(WeekMark.__members__)
+    missing: set[str] = set(WeekMark.__members__) - set(WEEK_MARKS_PARITIES)
+
+    if unknown or missing:
+        raise KeyError(
+            f"WEEK_MARKS_PARITIES не совпадает с WeekMark: лишние {sorted(unknown)}, недостающие {sorted(missing)}"
+        )
+
+    parities: dict[Any, tuple[int, ...]] = {}
+
+    for name, week_parities in WEEK_MARKS_PARITIES.items():
+        week_mark: WeekMark = WeekMark[name]
+        parities[week_mark] = week_parities
+        parities[week_mark.value] = week_parities
+
+    return parities
+
+
+def week_mark_parities(week_mark: Any) -> tuple[int, ...]:
+    # Отметка недели может быть как перечислением из парсера, так и его значением из JSON-экспорта
+    parities: Optional[tuple[int, ...]] = _week_marks_parities().get(week_mark)
+
+    if parities is None:
+        raise KeyError(f"Неизвестная отметка недели: {week_mark}")
+
+    return parities
+
+
+def iter_lesson_dates(week_mark: Any, week_day: int, semester: Semester) -> Iterator[date]:
+    parities: tuple[int, ...] = week_mark_parities(week_mark)
+    # `week_day` уже нормализован: 0 - понедельник
+    day: date = semester.first_monday + timedelta(days=week_day)
+
+    while day <= semester.end:
+        if day >= semester.start and semester.week_parity(day) in parities:
+            yield day
+        day += timedelta(days=7)
@@ -0,0 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import Iterable, Optional, Union
+
+from .creator_fk import PK, create_entities_pks
+from .normalizer import lessons_normalize, get_teachers_by_initials, get_teachers_typo_index, resolve_lesson_teacher
+from .schedule_parser.tvgu_schedule_parser.misc import AllGroupsSchedules, Group, TeacherSmall
+from .teacher_typo_index import LazyTeachersTypoIndex, TeacherTypoMatch
+from .teachers_parser.tvgu_teachers_parser.misc import Teacher
+from .types import LessonWithGroups
+
+# Пары объединяются только внутри одного времени и места, а преподаватели разрешаются для каждой пары отдельно,
+# поэтому нормализация хорошо делится по факультетам. Пары, общие для нескольких факультетов (например, потоковые
+# лекции), объединяются уже при слиянии шардов
+
+ResolvedTeacher = Optional[Union[TeacherSmall, Teacher]]
+# Пара факультета и преподаватели, сопоставленные каждому преподавателю из расписания (`None` - пропущенный)
+ShardLesson = tuple[LessonWithGroups, tuple[ResolvedTeacher, ...]]
+# Пары факультета и сопоставления преподавателей с опечатками, сделанные при их разборе
+ShardResult = tuple[list[ShardLesson], dict[str, TeacherTypoMatch]]
+
+# Справочник преподавателей передаётся в каждый процесс один раз через инициализатор пула, а не с каждым шардом
+_worker_teachers_by_initials: dict[str, list[Teacher]] = {}
+_worker_typo_index: Optional[LazyTeachersTypoIndex] = None
+
+
+def _init_shard_worker(teachers: list[Teacher]) -> None:
+    global _worker_teachers_by_initials, _worker_typo_index
+    _worker_teachers_by_initials = get_teachers_by_initials(teachers)
+    _worker_typo_index = get_teachers_typo_index(_worker_teachers_by_initials)
+
+
+def normalize_faculty_shard(faculty_schedules: AllGroupsSchedules) -> ShardResult:
+    typo_report: dict[str, TeacherTypoMatch] = {}
+    shard_lessons: list[ShardLesson] = [
+        (
+            lesson,
+            tuple(
+                resolve_lesson_teacher(
+                    lesson, teacher_small, _worker_teachers_by_initials, _worker_typo_index, typo_report
+                )
+                for teacher_small in lesson.teachers
+            )
+        )
+        for lesson in lessons_normalize(faculty_schedules)
+    ]
+
+    return shard_lessons, typo_report
+
+
+def merge_faculty_shards(shards: Iterable[ShardResult],
+                         typo_report: Optional[dict[str, TeacherTypoMatch]] = None) -> dict[tuple, PK]:
+    # Шарды должны идти в порядке факультетов исходных расписаний: тогда базовая пара, порядок преподавателей
+    # и порядок пар (а значит, и идентификаторы) совпадают с однопроцессным режимом
+    merged: dict[tuple, tuple[LessonWithGroups, dict[str, ResolvedTeacher], set[Group]]] = {}
+
+    for shard_lessons, shard_typo_report in shards:
+        if typo_report is not None:
+            typo_report.update(shard_typo_report)
+
+        for lesson, resolved_teachers in shard_lessons:
+            lesson_key: tuple = lesson._identify()
+
+            if lesson_key not in merged:
+                merged[lesson_key] = (lesson, {}, set())
+
+            _, teachers_by_initials, groups = merged[lesson_key]
+
+            # Как и в `lessons_normalize`, повторениями считаются только совпадения инициал из расписания
+            for teacher_small, teacher in zip(lesson.teachers, resolved_teachers):
+                teachers_by_initials.setdefault(teacher_small.initials, teacher)
+
+            groups.update(lesson.groups)
+
+    merged_lessons: Iterable[LessonWithGroups] = (
+        replace(
+            base_lesson,
+            teachers=tuple(teacher for teacher in teachers_by_initials.values() if teacher is not None),
+            groups=tuple(groups)
+        )
+        for base_lesson, teachers_by_initials, groups in merged.values()
+    )
+
+    # Локальные номера пар внутри шардов отбрасываются, глобальные идентификаторы выдаются по объединённым парам
+    return create_entities_pks(merged_lessons, custom_key_getter=lambda lesson: lesson._identify())
+
+
+def prepare_lessons_sharded(schedules: AllGroupsSchedules, teachers: list[Teacher], max_workers: Optional[int] = None,
+                            typo_report: Optional[dict[str, TeacherTypoMatch]] = None) -> dict[tuple, PK]:
+    """Аналог `lessons_normalize` + `normalize_teachers_for_lessons`, выполняемый по факультетам в пуле процессов"""
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_shard_worker,
+                             initargs=(teachers,)) as executor:
+        shards: Iterable[ShardResult] = executor.map(
+            normalize_faculty_shard,
+            ({faculty_code: groups_schedule} for faculty_code, groups_schedule in schedules.items())
+        )
+
+        return merge_faculty_shards(shards, typo_report)
@@ -0,0 +1,148 @@
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .misc import make_entity_file_name, make_file_name, write_if_changed, load_manifest, save_manifest
+from .snapshot import SnapshotDict, snapshot_as_dict, teacher_display_name
+from .snapshot_diff import COLLECTIONS, Key, Record, materialize_record, resolve_snapshot
+
+# Статический экспорт по шардам: отдельный самодостаточный JSON на каждую группу, преподавателя и место.
+# В шард попадают только пары сущности и то, на что они ссылаются; идентификаторы внутри шарда локальные и выдаются
+# по естественным ключам, поэтому шард с тем же содержимым байт-в-байт совпадает между запусками, даже если
+# глобальные идентификаторы поменялись. Ссылки на сущности вне шарда (например, на другие группы структуры) опускаются
+
+SHARD_COLLECTIONS: tuple[str, ...] = ("structs", "teachers", "places", "subjects", "groups", "lessons")
+
+
+@dataclass(frozen=True, kw_only=True)
+class ShardJob:
+    path: Path
+    shard: SnapshotDict
+    prettify: bool
+    known_hash: Optional[str]
+
+
+@dataclass(frozen=True, kw_only=True)
+class ShardsExportResult:
+    written: list[str]
+    unchanged: list[str]
+    removed: list[str]
+
+
+def _write_shard_job(job: ShardJob) -> tuple[str, bool]:
+    content: str = json.dumps(job.shard, ensure_ascii=False, indent=2 if job.prettify else None)
+    return write_if_changed(job.path, content, job.known_hash)
+
+
+def _build_shard(resolved: dict[str, dict[Key, tuple[Optional[int], Record]]],
+                 lessons_keys: list[Key], own: tuple[str, Key]) -> SnapshotDict:
+    keys: dict[str, set[Key]] = {name: set() for name in SHARD_COLLECTIONS}
+    keys[own[0]].add(own[1])
+    keys["lessons"].update(lessons_keys)
+
+    for lesson_key in lessons_keys:
+        lesson: Record = resolved["lessons"][lesson_key][1]
+
+        keys["groups"].update(lesson["groups_ids"])
+        keys["teachers"].update(lesson["teachers_ids"])
+        keys["subjects"].add(lesson["subject_id"])
+        keys["places"].add(lesson["place_id"])
+
+    keys["structs"].update(resolved["groups"][group_key][1]["struct_id"] for group_key in keys["groups"])
+    keys["structs"].discard(None)
+
+    # Локальные идентификаторы по отсортированным ключам - чтобы содержимое шарда не зависело от глобальных
+    sorted_keys: dict[str, list[Key]] = {name: sorted(keys[name], key=repr) for name in SHARD_COLLECTIONS}
+    # Коллекции вне шарда (например, кафедры структуры) остаются пустыми, и ссылки на них опускаются
+    keys_to_ids: dict[str, dict[Key, int]] = defaultdict(dict)
+
+    for name, collection_keys in sorted_keys.items():
+        keys_to_ids[name] = {key: local_id for local_id, key in enumerate(collection_keys)}
+
+    return {
+        name: [
+            materialize_record(
+                keys_to_ids[name][key], resolved[name][key][1], COLLECTIONS[name], keys_to_ids, skip_missing=True
+            )
+            for key in sorted_keys[name]
+        ]
+        for name in SHARD_COLLECTIONS
+    }
+
+
+def _collect_shards(snapshot: SnapshotDict) -> dict[str, SnapshotDict]:
+    resolved: dict[str, dict[Key, tuple[Optional[int], Record]]] = resolve_snapshot(snapshot)
+
+    lessons_by_entity: dict[tuple[str, Key], list[Key]] = defaultdict(list)
+
+    for lesson_key, (_, lesson) in resolved["lessons"].items():
+        for group_key in lesson["groups_ids"]:
+            lessons_by_entity["groups", group_key].append(lesson_key)
+        for teacher_key in lesson["teachers_ids"]:
+            lessons_by_entity["teachers", teacher_key].append(lesson_key)
+        lessons_by_entity["places", lesson["place_id"]].append(lesson_key)
+
+    # Относительный путь -> шард
+    shards: dict[str, SnapshotDict] = {}
+
+    for group_key, (_, group) in resolved["groups"].items():
+        shards[f"groups/{make_file_name(group['origin_name'])}.json"] = _build_shard(
+            resolved, lessons_by_entity["groups", group_key], ("groups", group_key)
+        )
+
+    for teacher_key, (_, teacher) in resolved["teachers"].items():
+        shards[f"teachers/{make_entity_file_name(teacher_display_name(teacher), teacher_key)}.json"] = _build_shard(
+            resolved, lessons_by_entity["teachers", teacher_key], ("teachers", teacher_key)
+        )
+
+    for place_key, (_, place) in resolved["places"].items():
+        shards[f"places/{make_file_name(place['name'])}.json"] = _build_shard(
+            resolved, lessons_by_entity["places", place_key], ("places", place_key)
+        )
+
+    return shards
+
+
+def export_shards(data: Any, directory: Union[str, Path], max_workers: Optional[int] = None,
+                  prettify: bool = False) -> ShardsExportResult:
+    snapshot: SnapshotDict = snapshot_as_dict(data)
+    directory: Path = Path(directory)
+    manifest: dict[str, dict[str, str]] = load_manifest(directory)
+
+    jobs: list[tuple[str, ShardJob]] = [
+        (
+            relative_path,
+            ShardJob(
+                path=directory / relative_path,
+                shard=shard,
+                prettify=prettify,
+                known_hash=manifest.get(relative_path, {}).get("content")
+            )
+        )
+        for relative_path, shard in _collect_shards(snapshot).items()
+    ]
+
+    new_manifest: dict[str, dict[str, str]] = {}
+    written: list[str] = []
+    unchanged: list[str] = []
+
+    if jobs:
+        workers: int = max_workers or os.cpu_count() or 1
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _write_shard_job, (job for _, job in jobs), chunksize=max(1, len(jobs) // (workers * 4))
+            )
+
+            for (relative_path, _), (content_hash, is_written) in zip(jobs, results):
+                new_manifest[relative_path] = {"content": content_hash}
+                (written if is_written else unchanged).append(relative_path)
+
+    removed: list[str] = [relative_path for relative_path in manifest if relative_path not in new_manifest]
+    save_manifest(directory, new_manifest, removed)
+
+    return ShardsExportResult(written=written, unchanged=unchanged, removed=removed)
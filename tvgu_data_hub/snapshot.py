@@ -0,0 +1,40 @@
+import json
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Union
+
+from .misc import CustomEncoder
+
+# Модуль намеренно не импортирует ни парсеры, ни агрегацию: снимки - это уже готовый JSON-экспорт,
+# и для работы с ними сбор данных не нужен
+
+SnapshotDict = dict[str, list[dict[str, Any]]]
+
+
+def load_snapshot(path: Union[str, Path]) -> SnapshotDict:
+    with open(path, encoding="UTF-8") as file:
+        snapshot: SnapshotDict = json.load(file)
+
+    if not isinstance(snapshot, dict):
+        raise ValueError(f"Файл {path} не является снимком данных ТвГУ")
+
+    return snapshot
+
+
+def snapshot_as_dict(data: Any) -> SnapshotDict:
+    # `TvGUInfo` приводится к тому же виду, что и у JSON-экспорта, чтобы со свежими данными и со снимками
+    # можно было работать одинаково
+    if isinstance(data, dict):
+        return data
+
+    if not is_dataclass(data):
+        raise TypeError(f"Неподдерживаемый тип снимка: {type(data)}")
+
+    return json.loads(json.dumps(asdict(data), ensure_ascii=False, cls=CustomEncoder))
+
+
+def teacher_display_name(teacher: dict[str, Any]) -> str:
+    # У сопоставленных преподавателей есть полное ФИО, у остальных - только инициалы из расписания
+    if teacher.get("surname"):
+        return " ".join(part for part in (teacher["surname"], teacher.get("name"), teacher.get("patronymic")) if part)
+    return teacher["initials"]
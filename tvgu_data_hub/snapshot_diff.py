@@ -0,0 +1,268 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from .snapshot import SnapshotDict, snapshot_as_dict
+
+# Идентификаторы сущностей нестабильны между запусками, поэтому снимки сравниваются по естественным ключам
+# (аналогам `_identify()`/`get_pk()`), а ссылки по идентификаторам заменяются на ключи связанных сущностей
+
+Key = tuple
+Record = dict[str, Any]
+Patch = dict[str, Any]
+
+
+@dataclass(frozen=True, kw_only=True)
+class CollectionSpec:
+    key_getter: Callable[[Record], Key]
+    # Поле со ссылкой -> коллекция, на которую ссылается поле
+    refs: dict[str, str] = field(default_factory=dict)
+    # То же для полей со списком ссылок
+    multi_refs: dict[str, str] = field(default_factory=dict)
+    # У записей коллекции есть собственные идентификаторы
+    has_id: bool = True
+
+
+def _teacher_key(teacher: Record) -> Key:
+    if "surname" in teacher:
+        return teacher["name"], teacher["surname"], teacher["patronymic"]
+    return (teacher["initials"],)
+
+
+# Порядок совпадает с порядком полей `TvGUInfo`
+COLLECTIONS: dict[str, CollectionSpec] = {
+    "departments": CollectionSpec(
+        key_getter=lambda department: (department["name"],),
+        refs={"boss_id": "teachers", "struct_id": "structs"}
+    ),
+    "structs": CollectionSpec(
+        key_getter=lambda struct: (struct["name"],),
+        refs={"boss_id": "teachers"},
+        multi_refs={"groups_ids": "groups", "departments_ids": "departments"}
+    ),
+    "teachers": CollectionSpec(key_getter=_teacher_key),
+    "places": CollectionSpec(key_getter=lambda place: (place["name"],)),
+    "subjects": CollectionSpec(key_getter=lambda subject: (subject["name"], subject["type"])),
+    "subject_aliases": CollectionSpec(
+        key_getter=lambda alias: (alias["name"], alias["type"]),
+        refs={"subject_id": "subjects"},
+        has_id=False
+    ),
+    "groups": CollectionSpec(
+        key_getter=lambda group: (group["origin_name"],),
+        refs={"struct_id": "structs"}
+    ),
+    "lessons": CollectionSpec(
+        # Ключ занятия содержит ключи предмета и места, поэтому считается уже по записи с разрешёнными ссылками
+        key_getter=lambda lesson: (
+            lesson["week_mark"], lesson["week_day"], lesson["lesson_number"], lesson["subject_id"], lesson["place_id"]
+        ),
+        refs={"subject_id": "subjects", "place_id": "places"},
+        multi_refs={"groups_ids": "groups", "teachers_ids": "teachers"}
+    ),
+}
+
+
+def freeze(value: Any) -> Any:
+    # Ключи из JSON-патча приходят списками, а для словарей нужны кортежи
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def content_hash(record: Record) -> str:
+    return hashlib.blake2b(
+        json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("UTF-8"),
+        digest_size=16
+    ).hexdigest()
+
+
+def _unique_keys(records: list[Record], key_getter: Callable[[Record], Key]) -> list[Key]:
+    # Естественные ключи могут совпадать (например, одноимённые кафедры), такие записи различаются номером вхождения
+    keys: list[Key] = []
+    occurrences: dict[Key, int] = {}
+
+    for record in records:
+        key: Key = freeze(key_getter(record))
+        occurrence: int = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+
+        keys.append(key if occurrence == 0 else (*key, occurrence))
+
+    return keys
+
+
+def collection_keys(snapshot: SnapshotDict, name: str) -> dict[int, Key]:
+    """Идентификатор -> естественный ключ записи для коллекций, ключ которых не зависит от других коллекций"""
+
+    records: list[Record] = snapshot.get(name, [])
+
+    return {
+        record["id"]: key for record, key in zip(records, _unique_keys(records, COLLECTIONS[name].key_getter))
+    }
+
+
+def _ids_to_keys(snapshot: SnapshotDict) -> dict[str, dict[int, Key]]:
+    ids_to_keys: dict[str, dict[int, Key]] = {}
+
+    for name, spec in COLLECTIONS.items():
+        # На занятия никто не ссылается, а их ключ зависит от других коллекций; у псевдонимов нет идентификаторов
+        if name == "lessons" or not spec.has_id:
+            continue
+
+        ids_to_keys[name] = collection_keys(snapshot, name)
+
+    return ids_to_keys
+
+
+def _resolve_record(record: Record, spec: CollectionSpec, ids_to_keys: dict[str, dict[int, Key]]) -> Record:
+    resolved: Record = {}
+
+    for field_name, value in record.items():
+        if field_name == "id":
+            continue
+
+        if value is None:
+            resolved[field_name] = value
+        elif field_name in spec.refs:
+            resolved[field_name] = ids_to_keys[spec.refs[field_name]][value]
+        elif field_name in spec.multi_refs:
+            # Порядок у списков ссылок не несёт смысла (например, группы занятия берутся из множества)
+            resolved[field_name] = sorted(
+                (ids_to_keys[spec.multi_refs[field_name]][ref_id] for ref_id in value), key=repr
+            )
+        else:
+            resolved[field_name] = value
+
+    return resolved
+
+
+def resolve_snapshot(snapshot: SnapshotDict) -> dict[str, dict[Key, tuple[Optional[int], Record]]]:
+    """Коллекция -> естественный ключ -> (идентификатор, запись со ссылками через ключи вместо идентификаторов)"""
+
+    ids_to_keys: dict[str, dict[int, Key]] = _ids_to_keys(snapshot)
+    resolved: dict[str, dict[Key, tuple[Optional[int], Record]]] = {}
+
+    for name, spec in COLLECTIONS.items():
+        records: list[Record] = snapshot.get(name, [])
+        resolved_records: list[Record] = [_resolve_record(record, spec, ids_to_keys) for record in records]
+
+        resolved[name] = {
+            key: (record.get("id"), resolved_record)
+            for record, resolved_record, key in zip(
+                records, resolved_records, _unique_keys(resolved_records, spec.key_getter)
+            )
+        }
+
+    return resolved
+
+
+def materialize_record(record_id: Optional[int], record: Record, spec: CollectionSpec,
+                       keys_to_ids: dict[str, dict[Key, int]], skip_missing: bool = False) -> Record:
+    """
+    Обратное к разрешению ссылок: ключи связанных сущностей снова заменяются идентификаторами.
+    При `skip_missing` ссылки на сущности, которых нет в `keys_to_ids`, опускаются, а не приводят к ошибке
+    """
+
+    materialized: Record = {} if record_id is None else {"id": record_id}
+
+    for field_name, value in record.items():
+        if value is None:
+            materialized[field_name] = value
+        elif field_name in spec.refs:
+            ids: dict[Key, int] = keys_to_ids[spec.refs[field_name]]
+            materialized[field_name] = ids.get(freeze(value)) if skip_missing else ids[freeze(value)]
+        elif field_name in spec.multi_refs:
+            ids: dict[Key, int] = keys_to_ids[spec.multi_refs[field_name]]
+            materialized[field_name] = [
+                ids[ref_key] for ref_key in map(freeze, value) if not skip_missing or ref_key in ids
+            ]
+        else:
+            materialized[field_name] = value
+
+    return materialized
+
+
+def diff_snapshots(old: Any, new: Any) -> Patch:
+    """
+    Компактный патч между двумя снимками (`TvGUInfo` или JSON-экспортом).
+    Для каждой коллекции перечисляются пары (ключ, запись) добавленных и изменённых записей (ссылки в них заданы
+    ключами) и ключи удалённых записей; коллекции без изменений в патч не попадают
+    """
+
+    old_resolved = resolve_snapshot(snapshot_as_dict(old))
+    new_resolved = resolve_snapshot(snapshot_as_dict(new))
+
+    collections: dict[str, dict[str, list]] = {}
+
+    for name in COLLECTIONS:
+        old_records: dict[Key, tuple[Optional[int], Record]] = old_resolved[name]
+        new_records: dict[Key, tuple[Optional[int], Record]] = new_resolved[name]
+
+        added: list[tuple[Key, Record]] = []
+        changed: list[tuple[Key, Record]] = []
+
+        for key, (_, record) in new_records.items():
+            old_entry: Optional[tuple[Optional[int], Record]] = old_records.get(key)
+
+            if old_entry is None:
+                added.append((key, record))
+            elif content_hash(old_entry[1]) != content_hash(record):
+                changed.append((key, record))
+
+        removed: list[Key] = [key for key in old_records if key not in new_records]
+
+        if added or changed or removed:
+            collections[name] = {"added": added, "changed": changed, "removed": removed}
+
+    return {"collections": collections}
+
+
+def apply_patch(snapshot: Any, patch: Patch) -> SnapshotDict:
+    """
+    Применение патча из `diff_snapshots` к снимку.
+    Записи, существовавшие в исходном снимке, сохраняют свои идентификаторы, новым выдаются следующие свободные
+    """
+
+    resolved = resolve_snapshot(snapshot_as_dict(snapshot))
+
+    for name, changes in patch["collections"].items():
+        records: dict[Key, tuple[Optional[int], Record]] = resolved[name]
+
+        for key in changes["removed"]:
+            records.pop(freeze(key), None)
+
+        for raw_key, record in (*changes["changed"], *changes["added"]):
+            key: Key = freeze(raw_key)
+            old_entry: Optional[tuple[Optional[int], Record]] = records.get(key)
+
+            records[key] = (None if old_entry is None else old_entry[0], record)
+
+    keys_to_ids: dict[str, dict[Key, int]] = {}
+
+    for name, records in resolved.items():
+        if not COLLECTIONS[name].has_id:
+            continue
+
+        next_id: int = max((record_id for record_id, _ in records.values() if record_id is not None), default=-1) + 1
+        keys_to_ids[name] = {}
+
+        for key, (record_id, record) in records.items():
+            if record_id is None:
+                record_id = next_id
+                next_id += 1
+                records[key] = (record_id, record)
+
+            keys_to_ids[name][key] = record_id
+
+    result: SnapshotDict = {}
+
+    for name, records in resolved.items():
+        spec: CollectionSpec = COLLECTIONS[name]
+        result[name] = []
+
+        for record_id, record in records.values():
+            result[name].append(materialize_record(record_id, record, spec, keys_to_ids))
+
+    return result
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from typing import Optional, TYPE_CHECKING
+
+from .search_index import normalize_search_text, text_ngrams
+
+if TYPE_CHECKING:
+    from .schedule_parser.tvgu_schedule_parser.consts import SubjectType
+
+# Объединение вариантов написания одного предмета из расписаний разных факультетов. Варианты, различающиеся только
+# пробелами и пунктуацией, объединяются по общему ключу. Поиск сокращений по всем парам названий был бы
+# квадратичным, поэтому кандидаты сначала собираются LSH-блоками по MinHash-сигнатурам триграмм слов названия,
+# и только внутри блоков проверяются точно. Посимвольное сходство не используется: оно не отличает опечатку от
+# другого префикса или номера («Макроэкономика» и «Микроэкономика», «Математический анализ 1» и «... 2»)
+
+SubjectKey = tuple[str, "SubjectType"]
+
+MINHASH_PERMUTATIONS = 32
+# Полосы по `MINHASH_PERMUTATIONS // LSH_BANDS` значений: чем короче полоса, тем больше кандидатов с невысоким
+# сходством попадает в общий блок (сокращения вроде «мат. анализ» похожи на полное название лишь частично)
+LSH_BANDS = 16
+MINHASH_SEED = 20240901
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Минимальная длина сокращённого слова с точкой (без точки - на букву больше)
+ABBREVIATION_MIN_LENGTH = 2
+VOWELS = frozenset("аеиоуыэюяaeiouy")
+
+_random = random.Random(MINHASH_SEED)
+PERMUTATIONS: tuple[tuple[int, int], ...] = tuple(
+    (_random.randrange(1, MERSENNE_PRIME), _random.randrange(0, MERSENNE_PRIME)) for _ in range(MINHASH_PERMUTATIONS)
+)
+del _random
+
+
+def _shingle_hash(shingle: str) -> int:
+    # Встроенный `hash` строк меняется между запусками, а блоки должны быть воспроизводимы
+    return int.from_bytes(hashlib.blake2b(shingle.encode("UTF-8"), digest_size=8).digest(), "little")
+
+
+def minhash_signature(shingles: set[str]) -> tuple[int, ...]:
+    hashes: list[int] = [_shingle_hash(shingle) for shingle in shingles]
+
+    return tuple(min((a * value + b) % MERSENNE_PRIME for value in hashes) for a, b in PERMUTATIONS)
+
+
+def _name_words(name: str) -> list[tuple[str, bool]]:
+    """Слова названия в виде `normalize_search_text` и признак точки сразу после слова"""
+
+    return [
+        (match.group(1), match.group(2) is not None)
+        for match in re.finditer(r"(\w+)\s*(\.)?", name.lower().replace("ё", "е"))
+    ]
+
+
+def _is_abbreviated_word(short_word: str, has_dot: bool, full_word: str) -> bool:
+    if len(short_word) >= len(full_word) or not full_word.startswith(short_word):
+        return False
+
+    # Сокращение отмечено точкой («мат.», «ин.»)
+    if has_dot:
+        return len(short_word) >= ABBREVIATION_MIN_LENGTH
+
+    # Без точки сокращением считается только явно усечённое слово: не длиннее половины полного и обрезанное
+    # перед гласной, как принято в русских сокращениях («мат анализ»). Так «право» не станет «правоведением»
+    return (
+        len(short_word) >= ABBREVIATION_MIN_LENGTH + 1
+        and len(short_word) * 2 <= len(full_word)
+        and short_word[-1] not in VOWELS
+    )
+
+
+def is_abbreviation(short_name: str, full_name: str) -> bool:
+    """
+    `short_name` - сокращённое написание `full_name` («Мат. анализ» и «Математический анализ»): слова совпадают
+    или сокращены (см. `_is_abbreviated_word`), хотя бы одно слово сокращено. Названия из одного слова не
+    сокращаются - иначе «История» и «Историография» оказались бы одним предметом
+    """
+
+    short_words: list[tuple[str, bool]] = _name_words(short_name)
+    full_words: list[tuple[str, bool]] = _name_words(full_name)
+
+    if len(short_words) < 2 or len(short_words) != len(full_words):
+        return False
+
+    abbreviated: int = 0
+
+    for (short_word, has_dot), (full_word, _) in zip(short_words, full_words):
+        if short_word == full_word:
+            continue
+        if not _is_abbreviated_word(short_word, has_dot, full_word):
+            return False
+        abbreviated += 1
+
+    return abbreviated > 0
+
+
+def _compact_name(normalized_name: str) -> str:
+    # Варианты с пробелами и без них («Веб-программирование», «Веб программирование», «Вебпрограммирование»)
+    return normalized_name.replace(" ", "")
+
+
+def _find(parents: list[int], index: int) -> int:
+    while parents[index] != index:
+        parents[index] = parents[parents[index]]
+        index = parents[index]
+    return index
+
+
+def canonicalize_subjects(
+        subjects_counts: dict[tuple[Optional[str], SubjectType], int]
+) -> dict[SubjectKey, SubjectKey]:
+    """
+    Вариант предмета -> канонический вариант (в словарь попадают только неканонические варианты).
+    Варианты объединяются только внутри одного типа занятия; каноническим выбирается вариант с наибольшим числом пар,
+    а при равенстве - более длинный (полное название, а не сокращение)
+    """
+
+    # Порядок не зависит от порядка пар - тогда и выбор канонического варианта воспроизводим
+    variants: list[SubjectKey] = sorted(
+        (subject for subject in subjects_counts if subject[0] and normalize_search_text(subject[0])), key=repr
+    )
+    normalized: list[str] = [normalize_search_text(name) for name, _ in variants]
+
+    parents: list[int] = list(range(len(variants)))
+    # (тип занятия, название без пробелов и пунктуации) -> первый вариант с таким ключом
+    compact_variants: dict[tuple[SubjectType, str], int] = {}
+
+    for index, ((_, subject_type), normalized_name) in enumerate(zip(variants, normalized)):
+        same_variant: int = compact_variants.setdefault((subject_type, _compact_name(normalized_name)), index)
+
+        if same_variant != index:
+            parents[index] = same_variant
+
+    rows: int = MINHASH_PERMUTATIONS // LSH_BANDS
+    buckets: dict[tuple, list[int]] = {}
+
+    for index, ((_, subject_type), normalized_name) in enumerate(zip(variants, normalized)):
+        signature: tuple[int, ...] = minhash_signature(text_ngrams(normalized_name))
+
+        for band in range(LSH_BANDS):
+            bucket_key: tuple = (subject_type, band, signature[band * rows:(band + 1) * rows])
+            buckets.setdefault(bucket_key, []).append(index)
+
+    compared: set[tuple[int, int]] = set()
+    # Сокращённый вариант -> варианты, сокращением которых он может быть
+    abbreviations: dict[int, set[int]] = {}
+
+    for bucket in buckets.values():
+        for position, first in enumerate(bucket):
+            for second in bucket[position + 1:]:
+                if (first, second) in compared or _find(parents, first) == _find(parents, second):
+                    continue
+                compared.add((first, second))
+
+                # Для сокращений нужны исходные написания: в нормализованных названиях нет точек
+                first_source, second_source = variants[first][0], variants[second][0]
+
+                if is_abbreviation(first_source, second_source):
+                    abbreviations.setdefault(first, set()).add(second)
+                elif is_abbreviation(second_source, first_source):
+                    abbreviations.setdefault(second, set()).add(first)
+
+    # Сокращение присоединяется, только если оно однозначно: иначе через него слились бы разные предметы
+    # («мат. анализ» и для «математического анализа», и для «материального анализа»)
+    for short, full_variants in abbreviations.items():
+        full_roots: set[int] = {_find(parents, full) for full in full_variants}
+
+        if len(full_roots) == 1:
+            parents[_find(parents, short)] = full_roots.pop()
+
+    clusters: dict[int, list[SubjectKey]] = {}
+
+    for index, variant in enumerate(variants):
+        clusters.setdefault(_find(parents, index), []).append(variant)
+
+    aliases: dict[SubjectKey, SubjectKey] = {}
+
+    for cluster in clusters.values():
+        canonical: SubjectKey = max(cluster, key=lambda x: (subjects_counts[x], len(x[0]), x[0]))
+
+        for variant in cluster:
+            if variant != canonical:
+                aliases[variant] = canonical
+
+    return aliases
@@ -0,0 +1,169 @@
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+# Поиск преподавателя по инициалам с опечатками. Используется только тогда, когда точного совпадения инициал нет:
+# сначала сравниваются инициалы, приведённые к единому виду (латинские буквы-двойники, точки, пробелы, регистр),
+# а затем фамилии ищутся в BK-дереве по расстоянию Левенштейна. Буквы имени и отчества должны совпадать точно -
+# иначе «Иванов А.И.» легко превратился бы в «Иванов И.И.»
+
+# Латинские буквы, которые в расписаниях встречаются вместо похожих кириллических
+HOMOGLYPHS: dict[str, str] = {
+    "a": "а", "b": "в", "c": "с", "e": "е", "h": "н", "k": "к", "m": "м", "o": "о", "p": "р", "t": "т", "x": "х",
+    "y": "у", "ё": "е",
+}
+HOMOGLYPHS_TABLE: dict[int, str] = str.maketrans(HOMOGLYPHS)
+
+INITIALS_RE = re.compile(r"^\s*([^\s.]+)\s*([^\s.])?\.?\s*([^\s.])?\.?\s*$")
+
+
+@dataclass(frozen=True, kw_only=True)
+class TeacherTypoMatch:
+    # Инициалы из расписания
+    source: str
+    # Инициалы преподавателей, которым они были сопоставлены
+    matched: tuple[str, ...]
+    # Расстояние между фамилиями (0 - инициалы отличались только написанием)
+    distance: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class BKNode:
+    word: str
+    children: dict[int, "BKNode"] = field(default_factory=dict)
+
+
+def fold_initials(initials: str) -> Optional[tuple[str, str]]:
+    """(буквы имени и отчества, фамилия) в едином написании или `None`, если строка не похожа на инициалы"""
+
+    match: Optional[re.Match] = INITIALS_RE.match(initials.lower().translate(HOMOGLYPHS_TABLE))
+
+    if match is None:
+        return None
+
+    surname, name_letter, patronymic_letter = match.groups()
+
+    return (name_letter or "") + (patronymic_letter or ""), re.sub(r"\W+", "", surname)
+
+
+def bk_insert(root: BKNode, word: str, distance: Callable[[str, str], int]) -> None:
+    node: BKNode = root
+
+    while True:
+        word_distance: int = distance(word, node.word)
+
+        if word_distance == 0:
+            return
+
+        child: Optional[BKNode] = node.children.get(word_distance)
+
+        if child is None:
+            node.children[word_distance] = BKNode(word=word)
+            return
+
+        node = child
+
+
+def bk_search(root: BKNode, word: str, max_distance: int,
+              distance: Callable[[str, str], int]) -> list[tuple[str, int]]:
+    found: list[tuple[str, int]] = []
+    stack: list[BKNode] = [root]
+
+    while stack:
+        node: BKNode = stack.pop()
+        word_distance: int = distance(word, node.word)
+
+        if word_distance <= max_distance:
+            found.append((node.word, word_distance))
+
+        # По неравенству треугольника подходящие слова могут быть только в этих поддеревьях
+        for child_distance, child in node.children.items():
+            if word_distance - max_distance <= child_distance <= word_distance + max_distance:
+                stack.append(child)
+
+    return found
+
+
+@dataclass(frozen=True, kw_only=True)
+class TeachersTypoIndex:
+    # (буквы имени и отчества, фамилия) -> ключи словаря преподавателей по инициалам
+    exact: dict[tuple[str, str], list[str]]
+    # Буквы имени и отчества -> BK-дерево фамилий
+    trees: dict[str, BKNode]
+    max_distance: int
+
+    def lookup(self, initials: str) -> Optional[tuple[list[str], int]]:
+        """Ключи словаря преподавателей по инициалам для ближайших фамилий и расстояние до них"""
+
+        folded: Optional[tuple[str, str]] = fold_initials(initials)
+
+        if folded is None:
+            return None
+
+        exact_keys: Optional[list[str]] = self.exact.get(folded)
+
+        if exact_keys is not None:
+            return exact_keys, 0
+
+        letters, surname = folded
+        tree: Optional[BKNode] = self.trees.get(letters)
+
+        if tree is None or self.max_distance <= 0:
+            return None
+
+        from rapidfuzz.distance import Levenshtein
+
+        found: list[tuple[str, int]] = bk_search(tree, surname, self.max_distance, Levenshtein.distance)
+
+        if not found:
+            return None
+
+        # При нескольких одинаково близких фамилиях берутся все - дальше их разберут эвристики
+        best_distance: int = min(found_distance for _, found_distance in found)
+
+        return [
+            key
+            for found_surname, found_distance in found if found_distance == best_distance
+            for key in self.exact[letters, found_surname]
+        ], best_distance
+
+
+def build_teachers_typo_index(initials_keys: Iterable[str], max_distance: int) -> TeachersTypoIndex:
+    from rapidfuzz.distance import Levenshtein
+
+    exact: dict[tuple[str, str], list[str]] = {}
+    trees: dict[str, BKNode] = {}
+
+    for initials_key in initials_keys:
+        folded: Optional[tuple[str, str]] = fold_initials(initials_key)
+
+        if folded is None:
+            continue
+
+        exact.setdefault(folded, []).append(initials_key)
+
+        letters, surname = folded
+
+        if letters not in trees:
+            trees[letters] = BKNode(word=surname)
+        else:
+            bk_insert(trees[letters], surname, Levenshtein.distance)
+
+    return TeachersTypoIndex(exact=exact, trees=trees, max_distance=max_distance)
+
+
+@dataclass(kw_only=True)
+class LazyTeachersTypoIndex:
+    """
+    `TeachersTypoIndex`, который строится при первом поиске. Обычно все инициалы находятся точно,
+    и тогда ни BK-деревья, ни rapidfuzz не нужны
+    """
+
+    initials_keys: list[str]
+    max_distance: int
+    _index: Optional[TeachersTypoIndex] = field(default=None, init=False, repr=False)
+
+    def lookup(self, initials: str) -> Optional[tuple[list[str], int]]:
+        if self._index is None:
+            self._index = build_teachers_typo_index(self.initials_keys, self.max_distance)
+        return self._index.lookup(initials)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional, TYPE_CHECKING
+
+from .semester import Semester, week_mark_parities
+
+if TYPE_CHECKING:
+    from .hub import TvGUInfo
+    from .types import LessonAggregated
+
+
+@dataclass(frozen=True, kw_only=True)
+class TimetableEntry:
+    lesson: LessonAggregated
+    start: datetime
+    end: datetime
+
+
+@dataclass(frozen=True, kw_only=True)
+class Timetable:
+    semester: Semester
+    lessons_by_id: dict[int, LessonAggregated]
+    # (чётность недели, день недели) -> идентификаторы пар в порядке номеров пар
+    slots: dict[tuple[int, int], tuple[int, ...]]
+
+    def lessons_on(self, day: date, *, group_id: Optional[int] = None,
+                   teacher_id: Optional[int] = None) -> Iterator[TimetableEntry]:
+        if not self.semester.start <= day <= self.semester.end:
+            return
+
+        for lesson_id in self.slots.get((self.semester.week_parity(day), day.weekday()), ()):
+            lesson: LessonAggregated = self.lessons_by_id[lesson_id]
+
+            if group_id is not None and group_id not in lesson.groups_ids:
+                continue
+            if teacher_id is not None and teacher_id not in lesson.teachers_ids:
+                continue
+
+            start, end = self.semester.lesson_bounds(day, lesson.lesson_number)
+            yield TimetableEntry(lesson=lesson, start=start, end=end)
+
+    def lessons_between(self, start: date, end: date, *, group_id: Optional[int] = None,
+                        teacher_id: Optional[int] = None) -> Iterator[TimetableEntry]:
+        """Пары с `start` по `end` включительно; дни перебираются лениво, семестр целиком не разворачивается"""
+
+        day: date = max(start, self.semester.start)
+        last_day: date = min(end, self.semester.end)
+
+        while day <= last_day:
+            yield from self.lessons_on(day, group_id=group_id, teacher_id=teacher_id)
+            day += timedelta(days=1)
+
+
+def build_timetable(data: TvGUInfo, semester: Semester) -> Timetable:
+    slots: dict[tuple[int, int], list[LessonAggregated]] = {}
+
+    for lesson in data.lessons:
+        for parity in week_mark_parities(lesson.week_mark):
+            slots.setdefault((parity, lesson.week_day), []).append(lesson)
+
+    return Timetable(
+        semester=semester,
+        lessons_by_id={lesson.id: lesson for lesson in data.lessons},
+        slots={
+            slot: tuple(lesson.id for lesson in sorted(slot_lessons, key=lambda x: x.lesson_number))
+            for slot, slot_lessons in slots.items()
+        }
+    )
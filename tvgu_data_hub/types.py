@@ -107,6 +107,14 @@ class SubjectAggregated(NeedPK):
         return NotImplemented
 
 
+@dataclass(frozen=True, kw_only=True)
+class SubjectAliasAggregated:
+    # Вариант написания предмета из расписания, объединённый с каноническим предметом `subject_id`
+    name: str
+    type: SubjectType
+    subject_id: int
+
+
 @dataclass(frozen=True, kw_only=True)
 class PlaceAggregated(NeedPK):
     id: int